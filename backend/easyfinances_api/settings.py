@@ -47,6 +47,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'transactions.routers.ReplicaStickinessMiddleware',
 ]
 
 ROOT_URLCONF = 'easyfinances_api.urls'
@@ -70,12 +71,56 @@ WSGI_APPLICATION = 'easyfinances_api.wsgi.application'
 
 # --- BANCO DE DADOS ---
 # Configuração flexível que lê a URL do banco de dados do .env
+# DB_CONN_MAX_AGE mantém a conexão aberta entre requisições (em segundos,
+# 0 = fecha a cada requisição) e DB_CONN_HEALTH_CHECKS testa a conexão
+# reaproveitada antes de usá-la, evitando erros após quedas do banco.
 DATABASES = {
     'default': dj_database_url.config(
-        default=config('DATABASE_URL')
+        default=config('DATABASE_URL'),
+        conn_max_age=config('DB_CONN_MAX_AGE', default=60, cast=int),
+        conn_health_checks=config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
     )
 }
 
+# Pool nativo de conexões (Django 5.1+, apenas PostgreSQL com psycopg 3).
+# O pool substitui as conexões persistentes, então o CONN_MAX_AGE é zerado.
+DB_POOL = config('DB_POOL', default=False, cast=bool)
+if DB_POOL and 'postgresql' in DATABASES['default']['ENGINE']:
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+        'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+        'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+    }
+
+# Réplica de leitura opcional para as views de análise (dashboard, analytics,
+# relatórios). Para testar localmente com dois SQLite:
+#   DATABASE_REPLICA_URL=sqlite:///replica.sqlite3
+#   python manage.py migrate --database replica
+READ_REPLICA_ALIAS = 'replica'
+READ_REPLICA_STICKY_SECONDS = config('READ_REPLICA_STICKY_SECONDS', default=5, cast=int)
+DATABASE_REPLICA_URL = config('DATABASE_REPLICA_URL', default='')
+if DATABASE_REPLICA_URL:
+    DATABASES[READ_REPLICA_ALIAS] = dj_database_url.parse(
+        DATABASE_REPLICA_URL,
+        conn_max_age=DATABASES['default']['CONN_MAX_AGE'],
+        conn_health_checks=DATABASES['default']['CONN_HEALTH_CHECKS'],
+        test_options={'MIRROR': 'default'},
+    )
+    DATABASE_ROUTERS = ['transactions.routers.ReadReplicaRouter']
+
+# --- CACHE ---
+# O padrão (LocMemCache) é por processo. Com a réplica de leitura é obrigatório
+# um cache compartilhado, ex.:
+#   CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+#   CACHE_LOCATION=redis://127.0.0.1:6379/1
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
 # --- VALIDAÇÃO DE SENHA (sem alterações) ---
 AUTH_PASSWORD_VALIDATORS = [
     # ...
@@ -105,11 +150,15 @@ CORS_ALLOW_CREDENTIALS = True
 APPEND_SLASH = False
 
 # --- CONFIGURAÇÃO DO REST FRAMEWORK E JWT (sem alterações) ---
+# O JWT (com cache do usuário) vem primeiro: clientes que enviam o header
+# 'Authorization: Bearer' nunca passam pelo SessionAuthentication.
+# Defina API_SESSION_AUTH=False para uma API puramente JWT.
+DEFAULT_AUTHENTICATION_CLASSES = ['transactions.authentication.CachedJWTAuthentication']
+if config('API_SESSION_AUTH', default=True, cast=bool):
+    DEFAULT_AUTHENTICATION_CLASSES.append('rest_framework.authentication.SessionAuthentication')
+
 REST_FRAMEWORK = {
-    'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.SessionAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    ],
+    'DEFAULT_AUTHENTICATION_CLASSES': DEFAULT_AUTHENTICATION_CLASSES,
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
@@ -120,4 +169,31 @@ REST_FRAMEWORK = {
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
-}
\ No newline at end of file
+}
+
+# Cache em memória do CachedJWTAuthentication. É por processo: uma alteração
+# no usuário (desativação, exclusão, troca de senha) invalida na hora o cache do
+# worker que a fez; os demais só percebem quando a entrada expira (TTL em segundos).
+JWT_USER_CACHE_MAX_ENTRIES = config('JWT_USER_CACHE_MAX_ENTRIES', default=10000, cast=int)
+JWT_USER_CACHE_TTL = config('JWT_USER_CACHE_TTL', default=60, cast=int)
+
+# --- FILA DE TAREFAS (transactions.jobs) ---
+# Executadas pelo 'python manage.py run_jobs'. Com JOBS_EAGER=True elas rodam
+# na própria requisição (útil em desenvolvimento, sem worker).
+JOBS_EAGER = config('JOBS_EAGER', default=False, cast=bool)
+JOBS_MAX_ATTEMPTS = config('JOBS_MAX_ATTEMPTS', default=3, cast=int)
+IMPORT_MAX_ROWS = config('IMPORT_MAX_ROWS', default=10000, cast=int)
+
+# Dias à frente cobertos pelo feed de contas a vencer (transactions.notifications)
+NOTIFICATION_DAYS = config('NOTIFICATION_DAYS', default=7, cast=int)
+
+# --- MOEDAS ---
+# Moeda em que os KPIs são apresentados; contas em outras moedas são
+# convertidas pela tabela ExchangeRate (carregada com 'manage.py load_fx_rates').
+BASE_CURRENCY = config('BASE_CURRENCY', default='BRL')
+FX_CACHE_TTL = config('FX_CACHE_TTL', default=3600, cast=int)
+
+# --- SINCRONIZAÇÃO INCREMENTAL (/api/sync/) ---
+# Exclusões mais antigas que isso são descartadas; cursores anteriores recebem carga completa.
+SYNC_TOMBSTONE_DAYS = config('SYNC_TOMBSTONE_DAYS', default=90, cast=int)
+SYNC_CURSOR_OVERLAP_SECONDS = 5
@@ -0,0 +1,21 @@
+"""
+Perfil de produção: as mesmas configurações de settings.py, sem o que só
+serve ao desenvolvimento, para que cada worker suba (e recicle) mais rápido.
+
+Uso: DJANGO_SETTINGS_MODULE=easyfinances_api.settings_production
+Para comparar o boot: python manage.py profile_startup --settings=easyfinances_api.settings_production
+"""
+
+from .settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+# Apps e helpers usados apenas em desenvolvimento (shell_plus, runserver do WhiteNoise)
+DEV_ONLY_APPS = ['django_extensions', 'whitenoise.runserver_nostatic']
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in DEV_ONLY_APPS]
+
+# Só JSON: a API navegável (templates e formulários HTML) não é carregada
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+}
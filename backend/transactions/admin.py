@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Category, Account, Transaction
+from .models import Category, Account, Transaction, MonthlySummary, ClosedPeriod, ExchangeRate
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -12,7 +12,7 @@ class CategoryAdmin(admin.ModelAdmin):
 @admin.register(Account)
 class AccountAdmin(admin.ModelAdmin):
     # Melhoria: Exibir tipo e saldo para mais clareza
-    list_display = ("name", "type", "balance", "user")
+    list_display = ("name", "type", "currency", "balance", "user")
     search_fields = ("name",)
     list_filter = ("user", "type")
 
@@ -27,4 +27,20 @@ class TransactionAdmin(admin.ModelAdmin):
     def get_valor(self, obj):
         # Formatando o valor para o padrão brasileiro (BRL)
         return f"R$ {obj.amount:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-    get_valor.short_description = "Valor"
\ No newline at end of file
+    get_valor.short_description = "Valor"
+
+@admin.register(MonthlySummary)
+class MonthlySummaryAdmin(admin.ModelAdmin):
+    list_display = ("month", "category", "account", "total", "count", "user")
+    list_filter = ("user", "month")
+
+
+@admin.register(ClosedPeriod)
+class ClosedPeriodAdmin(admin.ModelAdmin):
+    list_display = ("user", "closed_through")
+
+
+@admin.register(ExchangeRate)
+class ExchangeRateAdmin(admin.ModelAdmin):
+    list_display = ("currency", "date", "rate")
+    list_filter = ("currency",)
@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class TransactionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'transactions'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        from . import checks  # noqa: F401 (registra os system checks)
+        from .search import repair_search_index
+        from . import tasks  # noqa: F401 (registra as tarefas da fila)
+        from .sync import connect_signals
+        from .authentication import connect_signals as connect_auth_signals
+        connect_signals()
+        connect_auth_signals()
+        post_migrate.connect(repair_search_index, sender=self)
@@ -0,0 +1,172 @@
+from django.db import transaction as db_transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+
+from .fx import converted, has_foreign_accounts
+from .models import Account, ArchivedTransaction, ClosedPeriod, MonthlySummary, Transaction
+
+
+def closed_through(user):
+    return ClosedPeriod.objects.filter(user=user).values_list('closed_through', flat=True).first()
+
+
+def _summary_filters(filters):
+    # Os filtros por 'date' viram filtros por 'month' (primeiro dia do mês)
+    return {
+        ('month' + key[4:] if key == 'date' or key.startswith('date__') else key): value
+        for key, value in filters.items()
+    }
+
+
+class Ledger:
+    """
+    Agregações sobre o histórico do usuário: transações dos períodos abertos
+    somadas aos resumos mensais (MonthlySummary) dos períodos fechados.
+    Sem período fechado, equivale a agregar direto em Transaction.
+
+    Nos períodos fechados a granularidade é mensal: um mês fechado entra num
+    intervalo de datas se o seu primeiro dia estiver dentro dele.
+
+    Os valores saem na moeda base: se o usuário tiver contas em outra moeda,
+    cada valor é multiplicado pela cotação da data dentro da própria query
+    (nos resumos mensais, a cotação do primeiro dia do mês).
+    """
+
+    def __init__(self, user, base_currency=True):
+        self.user = user
+        self.closed_through = closed_through(user)
+        # base_currency=False mantém os valores na moeda de cada conta
+        self.convert = base_currency and has_foreign_accounts(user)
+
+    def _amount(self):
+        return Sum(converted('amount', 'account__currency', 'date') if self.convert else F('amount'))
+
+    def _summary_total(self):
+        return Sum(converted('total', 'account__currency', 'month') if self.convert else F('total'))
+
+    def transactions(self, **filters):
+        queryset = Transaction.objects.filter(user=self.user, **filters)
+        if self.closed_through:
+            queryset = queryset.filter(date__gt=self.closed_through)
+        return queryset
+
+    def summaries(self, **filters):
+        if not self.closed_through:
+            return None
+        return MonthlySummary.objects.filter(user=self.user, **_summary_filters(filters))
+
+    def initial_balance(self, day):
+        """Soma dos saldos iniciais das contas, convertidos pela cotação de 'day'."""
+        amount = converted('balance', 'currency', day) if self.convert else F('balance')
+        return Account.objects.filter(user=self.user).aggregate(total=Sum(amount))['total'] or 0
+
+    def sum(self, **filters):
+        total = self.transactions(**filters).aggregate(total=self._amount())['total'] or 0
+        summaries = self.summaries(**filters)
+        if summaries is not None:
+            total += summaries.aggregate(total=self._summary_total())['total'] or 0
+        return total
+
+    def count(self, **filters):
+        count = self.transactions(**filters).count()
+        summaries = self.summaries(**filters)
+        if summaries is not None:
+            count += summaries.aggregate(count=Sum('count'))['count'] or 0
+        return count
+
+    def sum_by(self, field, **filters):
+        """Lista [{field: valor, 'total': soma}] ordenada pelo total, como um values().annotate()."""
+        totals = {}
+        for row in self.transactions(**filters).values(field).annotate(total=self._amount()):
+            totals[row[field]] = row['total']
+        summaries = self.summaries(**filters)
+        if summaries is not None:
+            for row in summaries.values(field).annotate(total=self._summary_total()):
+                totals[row[field]] = totals.get(row[field], 0) + row['total']
+        rows = [{field: key, 'total': total} for key, total in totals.items()]
+        return sorted(rows, key=lambda row: row['total'], reverse=True)
+
+    def monthly_by(self, fields, **filters):
+        """Linhas {campos..., 'month', 'total'} com a soma por mês (os meses fechados vêm dos resumos)."""
+        rows = list(
+            self.transactions(**filters).annotate(month=TruncMonth('date'))
+            .values(*fields, 'month').annotate(total=self._amount()).order_by()
+        )
+        summaries = self.summaries(**filters)
+        if summaries is not None:
+            rows += list(summaries.values(*fields, 'month').annotate(total=self._summary_total()).order_by())
+        return rows
+
+    def sum_by_period(self, trunc_kind, **filters):
+        """{início do período: soma}, agrupando as datas com TruncMonth/TruncWeek."""
+        totals = {}
+        for row in self.transactions(**filters).annotate(period=trunc_kind('date')).values('period').annotate(total=self._amount()):
+            totals[row['period']] = row['total']
+        summaries = self.summaries(**filters)
+        if summaries is not None:
+            for row in summaries.annotate(period=trunc_kind('month')).values('period').annotate(total=self._summary_total()):
+                totals[row['period']] = totals.get(row['period'], 0) + row['total']
+        return dict(sorted(totals.items()))
+
+
+def archive_user(user, cutoff, move=False):
+    """
+    Fecha o histórico do usuário até 'cutoff' (último dia de um mês): consolida
+    as transações em MonthlySummary e, com move=True, transfere as linhas para
+    ArchivedTransaction. Retorna (resumos criados, transações movidas).
+    """
+    previous = closed_through(user)
+    # Período já fechado: não há resumos novos, mas ainda dá para mover as linhas
+    already_closed = bool(previous and cutoff <= previous)
+    if already_closed and not move:
+        return 0, 0
+
+    with db_transaction.atomic():
+        summaries = []
+        if not already_closed:
+            rows = Transaction.objects.filter(user=user, date__lte=cutoff)
+            if previous:
+                rows = rows.filter(date__gt=previous)
+
+            summaries = [
+                MonthlySummary(
+                    user=user, account_id=row['account_id'], category_id=row['category_id'],
+                    month=row['month'], total=row['total'], count=row['count'],
+                )
+                for row in rows.annotate(month=TruncMonth('date'))
+                .values('account_id', 'category_id', 'month')
+                .annotate(total=Sum('amount'), count=Count('id'))
+                .order_by()
+            ]
+            MonthlySummary.objects.bulk_create(summaries)
+            ClosedPeriod.objects.update_or_create(user=user, defaults={'closed_through': cutoff})
+
+        moved = 0
+        if move:
+            # Moldes de recorrência com filhas ainda abertas ficam na tabela
+            # principal; apagá-los levaria as filhas junto (CASCADE).
+            movable = Transaction.objects.filter(user=user, date__lte=cutoff).exclude(
+                recurrences__date__gt=cutoff
+            )
+            ArchivedTransaction.objects.bulk_create(
+                (
+                    ArchivedTransaction(
+                        id=row.id, user_id=row.user_id, description=row.description, amount=row.amount,
+                        date=row.date, category_id=row.category_id, account_id=row.account_id,
+                        paid=row.paid, parent_transaction_id=row.parent_transaction_id,
+                    )
+                    for row in movable.iterator()
+                ),
+                batch_size=1000,
+            )
+            moved = movable.count()
+            # Continuam existindo (no arquivo): não são exclusões para a sincronização
+            movable.delete(tombstones=False)
+
+    return len(summaries), moved
+
+
+def is_closed(user, day):
+    closed = closed_through(user)
+    return bool(closed and day <= closed)
+
@@ -0,0 +1,110 @@
+import copy
+import threading
+import time
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+# Cache em memória (por processo) do mapeamento token -> usuário.
+# Cada entrada vive no máximo JWT_USER_CACHE_TTL segundos (e nunca além do
+# 'exp' do token). Alterações no User invalidam as entradas deste processo na
+# hora (sinais post_save/post_delete); nos demais workers, a defasagem máxima
+# é esse TTL.
+_cache = {}
+_keys_by_user = {}
+_lock = threading.Lock()
+
+
+def _max_entries():
+    return getattr(settings, 'JWT_USER_CACHE_MAX_ENTRIES', 10000)
+
+
+def _ttl():
+    return getattr(settings, 'JWT_USER_CACHE_TTL', 60)
+
+
+def _evict_expired(now):
+    expired = [key for key, (_, _, exp) in _cache.items() if exp <= now]
+    for key in expired:
+        _forget(key)
+
+
+def _forget(key):
+    entry = _cache.pop(key, None)
+    if entry is None:
+        return
+    user_id = entry[0].pk
+    keys = _keys_by_user.get(user_id)
+    if keys is not None:
+        keys.discard(key)
+        if not keys:
+            del _keys_by_user[user_id]
+
+
+def invalidate_user(user):
+    """Remove do cache todos os tokens do usuário (troca de senha, edição de perfil)."""
+    user_id = getattr(user, 'pk', user)
+    with _lock:
+        for key in list(_keys_by_user.get(user_id, ())):
+            _forget(key)
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+        _keys_by_user.clear()
+
+
+def _user_changed(sender, instance, **kwargs):
+    # Desativação, troca de senha, edição pelo admin, exclusão...
+    invalidate_user(instance)
+
+
+def connect_signals():
+    from django.contrib.auth import get_user_model
+    from django.db.models.signals import post_delete, post_save
+    user_model = get_user_model()
+    post_save.connect(_user_changed, sender=user_model, dispatch_uid='jwt-cache-user-saved')
+    post_delete.connect(_user_changed, sender=user_model, dispatch_uid='jwt-cache-user-deleted')
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication que evita decodificar o token e buscar o User no banco
+    a cada requisição, reaproveitando o resultado validado até o 'exp' do token.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        now = time.time()
+        with _lock:
+            entry = _cache.get(raw_token)
+            if entry is not None and entry[2] <= now:
+                _forget(raw_token)
+                entry = None
+        if entry is not None:
+            user, validated_token, _ = entry
+            # Cópia rasa para que uma requisição não altere o objeto das outras.
+            return copy.copy(user), validated_token
+
+        validated_token = self.get_validated_token(raw_token)
+        user = self.get_user(validated_token)
+
+        exp = validated_token.get('exp')
+        if exp is not None and _ttl() > 0:
+            expires = min(exp, now + _ttl())
+            with _lock:
+                if len(_cache) >= _max_entries():
+                    _evict_expired(now)
+                if len(_cache) < _max_entries():
+                    _cache[raw_token] = (user, validated_token, expires)
+                    _keys_by_user.setdefault(user.pk, set()).add(raw_token)
+
+        return copy.copy(user), validated_token
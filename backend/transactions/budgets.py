@@ -0,0 +1,104 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from .archive import Ledger
+from .fx import convert
+from .models import BudgetAlert, BudgetGoal
+
+# Percentuais do valor alvo que geram um alerta ao serem atingidos
+THRESHOLDS = (80, 100)
+CENTS = Decimal('0.01')
+
+
+def entries(transactions):
+    """(categoria, data, valor na moeda base) de cada transação; mesma conversão do Ledger."""
+    return [
+        (transaction.category_id, transaction.date, convert(transaction.amount, transaction.account.currency, transaction.date))
+        for transaction in transactions
+    ]
+
+
+def _level(spent, target):
+    if not target or target <= 0:
+        return 0
+    percent = spent * 100 / target
+    return max((threshold for threshold in THRESHOLDS if percent >= threshold), default=0)
+
+
+def _store(goals):
+    """Grava o gasto das metas (já ajustado em memória) e registra os limites cruzados."""
+    alerts = []
+    now = timezone.now()
+    for goal in goals:
+        goal.spent_amount = goal.spent_amount.quantize(CENTS)
+        # bulk_update não passa pelo auto_now; a sincronização depende de updated_at
+        goal.updated_at = now
+        level = _level(goal.spent_amount, goal.target_amount)
+        alerts += [
+            BudgetAlert(user_id=goal.user_id, goal=goal, threshold=threshold,
+                        spent_amount=goal.spent_amount, target_amount=goal.target_amount)
+            for threshold in THRESHOLDS if goal.alert_level < threshold <= level
+        ]
+        # Se o gasto voltou a ficar abaixo de um limite, ele pode alertar de novo depois
+        goal.alert_level = level
+    BudgetGoal.objects.bulk_update(goals, ['spent_amount', 'alert_level', 'updated_at'])
+    BudgetAlert.objects.bulk_create(alerts)
+    return alerts
+
+
+def refresh_goals(goals):
+    """Recalcula do zero o gasto das metas de limite (criação, edição ou cache invalidado)."""
+    goals = [goal for goal in goals if goal.goal_type == 'spending_limit' and goal.category_id]
+    for goal in goals:
+        goal.spent_amount = Decimal(Ledger(goal.user_id).sum(category_id=goal.category_id, date__range=(goal.start_date, goal.end_date)))
+    with db_transaction.atomic():
+        return _store(goals)
+
+
+def invalidate_goals(user=None):
+    """Marca o gasto das metas para ser recalculado (contas apagadas, câmbio alterado)."""
+    goals = BudgetGoal.objects.filter(goal_type='spending_limit')
+    if user is not None:
+        goals = goals.filter(user=user)
+    goals.update(spent_amount=None, updated_at=timezone.now())
+
+
+def apply_changes(user, added=(), removed=()):
+    """
+    Ajusta o gasto das metas de limite afetadas por um lote de transações
+    incluídas ('added') e/ou retiradas ('removed'), no formato de entries().
+    Uma única busca (pelo índice de categoria e janela) e uma única gravação
+    por lote, não importa quantas transações ele tenha.
+    """
+    by_category = defaultdict(list)
+    for category_id, day, amount in added:
+        by_category[category_id].append((day, amount))
+    for category_id, day, amount in removed:
+        by_category[category_id].append((day, -amount))
+    if not by_category:
+        return []
+
+    days = [day for changes in by_category.values() for day, _ in changes]
+    with db_transaction.atomic():
+        goals = list(
+            BudgetGoal.objects.select_for_update()
+            .filter(user=user, goal_type='spending_limit', category_id__in=by_category,
+                    start_date__lte=max(days), end_date__gte=min(days))
+        )
+        stale = [goal for goal in goals if goal.spent_amount is None]
+        alerts = refresh_goals(stale) if stale else []
+        changed = []
+        for goal in goals:
+            if goal in stale:
+                continue
+            delta = sum(
+                (amount for day, amount in by_category[goal.category_id] if goal.start_date <= day <= goal.end_date),
+                Decimal(0),
+            )
+            if delta:
+                goal.spent_amount += delta
+                changed.append(goal)
+        return alerts + _store(changed)
@@ -0,0 +1,77 @@
+import time
+
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connections
+from django.db.utils import DatabaseError
+
+
+@register(Tags.database)
+def check_database_connections(app_configs, databases=None, **kwargs):
+    # Roda com 'manage.py check --database default' (ex.: antes de subir o gunicorn).
+    errors = []
+    for alias in databases or []:
+        connection = connections[alias]
+        started = time.perf_counter()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except DatabaseError as exc:
+            errors.append(Error(
+                f"Não foi possível conectar ao banco '{alias}': {exc}",
+                id='transactions.E001',
+            ))
+            continue
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms > getattr(settings, 'DB_SLOW_CONNECT_MS', 500):
+            errors.append(Warning(
+                f"A conexão com o banco '{alias}' levou {elapsed_ms:.0f} ms.",
+                hint='Verifique a latência de rede ou habilite DB_POOL / DB_CONN_MAX_AGE.',
+                id='transactions.W003',
+            ))
+    return errors
+
+
+@register(Tags.database)
+def check_pool_configuration(app_configs, **kwargs):
+    errors = []
+    if not getattr(settings, 'DB_POOL', False):
+        return errors
+    for alias, db in settings.DATABASES.items():
+        if not db.get('OPTIONS', {}).get('pool'):
+            errors.append(Warning(
+                f"DB_POOL está ativo, mas o backend de '{alias}' ({db['ENGINE']}) não tem pool nativo.",
+                hint='O pool nativo do Django só existe para PostgreSQL; use DB_CONN_MAX_AGE nos demais bancos.',
+                id='transactions.W001',
+            ))
+    return errors
+
+
+@register(Tags.caches)
+def check_replica_pin_cache(app_configs, **kwargs):
+    # A marcação read-your-writes (routers.pin_to_primary) precisa ser vista por todos os workers
+    from .routers import replica_alias
+    if not replica_alias() or not isinstance(caches['default'], (LocMemCache, DummyCache)):
+        return []
+    return [Error(
+        "A réplica de leitura está configurada, mas o cache padrão não é compartilhado entre os processos.",
+        hint='Defina CACHE_BACKEND/CACHE_LOCATION (ex.: Redis ou DatabaseCache) para que uma escrita '
+             'feita num worker direcione ao primário as leituras atendidas pelos demais.',
+        id='transactions.E002',
+    )]
+
+
+@register(Tags.database, deploy=True)
+def check_connection_reuse(app_configs, **kwargs):
+    errors = []
+    for alias, db in settings.DATABASES.items():
+        if not db.get('OPTIONS', {}).get('pool') and not db.get('CONN_MAX_AGE'):
+            errors.append(Warning(
+                f"O banco '{alias}' abre uma conexão nova a cada requisição.",
+                hint='Defina DB_CONN_MAX_AGE (ex.: 60) ou DB_POOL=True para reaproveitar conexões.',
+                id='transactions.W002',
+            ))
+    return errors
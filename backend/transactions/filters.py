@@ -0,0 +1,98 @@
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Q
+from rest_framework import serializers
+
+# Faixa dos ids (BigAutoField)
+MIN_ID, MAX_ID = -(2 ** 63), 2 ** 63 - 1
+
+
+def _parse_date(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise serializers.ValidationError({name: 'Use uma data no formato AAAA-MM-DD.'})
+
+
+def _parse_decimal(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        number = Decimal(value)
+    except InvalidOperation:
+        number = None
+    # Decimal() também aceita NaN e Infinity, que o banco não sabe comparar
+    if number is None or not number.is_finite():
+        raise serializers.ValidationError({name: 'Informe um valor numérico.'})
+    return number
+
+
+def _parse_int(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        number = None
+    # Fora da faixa do BigAutoField o banco falha (OverflowError/DataError) em vez de não achar nada
+    if number is None or not MIN_ID <= number <= MAX_ID:
+        raise serializers.ValidationError({name: 'Informe um id numérico.'})
+    return number
+
+
+def _parse_bool(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    if value.lower() in ('true', '1'):
+        return True
+    if value.lower() in ('false', '0'):
+        return False
+    raise serializers.ValidationError({name: "Use 'true' ou 'false'."})
+
+
+def filter_transactions(queryset, params):
+    """
+    Aplica os filtros da query string: categoria, conta, tipo, pago, série
+    recorrente, faixa de valor e faixa de datas.
+    """
+    category = _parse_int(params, 'category')
+    if category is not None:
+        queryset = queryset.filter(category_id=category)
+    account = _parse_int(params, 'account')
+    if account is not None:
+        queryset = queryset.filter(account_id=account)
+
+    transaction_type = params.get('type')
+    if transaction_type:
+        if transaction_type not in ('income', 'expense'):
+            raise serializers.ValidationError({'type': "Use 'income' ou 'expense'."})
+        queryset = queryset.filter(category__type=transaction_type)
+    paid = _parse_bool(params, 'paid')
+    if paid is not None:
+        queryset = queryset.filter(paid=paid)
+    # Série recorrente: o molde (pai) e todas as suas filhas
+    series = _parse_int(params, 'series')
+    if series is not None:
+        queryset = queryset.filter(Q(pk=series) | Q(parent_transaction_id=series))
+
+    min_amount = _parse_decimal(params, 'min_amount')
+    if min_amount is not None:
+        queryset = queryset.filter(amount__gte=min_amount)
+    max_amount = _parse_decimal(params, 'max_amount')
+    if max_amount is not None:
+        queryset = queryset.filter(amount__lte=max_amount)
+
+    start_date = _parse_date(params, 'start_date')
+    if start_date is not None:
+        queryset = queryset.filter(date__gte=start_date)
+    end_date = _parse_date(params, 'end_date')
+    if end_date is not None:
+        queryset = queryset.filter(date__lte=end_date)
+    return queryset
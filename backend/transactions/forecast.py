@@ -0,0 +1,110 @@
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.conf import settings
+from django.db.models import Case, Count, DecimalField, F, Max, OuterRef, Subquery, Sum, When
+
+from .archive import Ledger
+from .fx import get_rate
+from .models import Account, Transaction
+from .recurrence import RecurrenceRule
+
+
+def signed_sum(field):
+    # Valor com sinal: receitas somam, despesas subtraem.
+    return Sum(
+        Case(
+            When(category__type='expense', then=-F(field)),
+            default=F(field),
+            output_field=DecimalField(max_digits=14, decimal_places=2),
+        )
+    )
+
+
+SIGNED_AMOUNT = signed_sum('amount')
+
+
+def build_forecast(user, start_date, days):
+    """
+    Curva de saldo projetado dia a dia, por conta, de start_date até start_date + days.
+
+    Cada conta tem um vetor de variações diárias (índice = dias desde start_date).
+    As transações conhecidas entram agrupadas por (conta, dia) numa única query,
+    as recorrências além do que já foi materializado saem do RecurrenceRule, e o
+    saldo final é a soma acumulada do vetor.
+    """
+    end_date = start_date + timedelta(days=days)
+    accounts = list(Account.objects.filter(user=user).order_by('name').values('id', 'name', 'currency', 'balance'))
+    deltas = {account['id']: [Decimal(0)] * (days + 1) for account in accounts}
+    for account in accounts:
+        deltas[account['id']][0] = account['balance']
+
+    # Saldo realizado até start_date (inclusive) vai para o índice 0,
+    # lendo os resumos mensais para os períodos fechados
+    # Só as contas do usuário: as que não estão em 'deltas' ficam de fora da curva
+    ledger = Ledger(user)
+    past = ledger.transactions(date__lte=start_date, account__user=user).values('account_id').annotate(net=SIGNED_AMOUNT)
+    for row in past:
+        deltas[row['account_id']][0] += row['net']
+    summaries = ledger.summaries(date__lte=start_date, account__user=user)
+    if summaries is not None:
+        for row in summaries.values('account_id').annotate(net=signed_sum('total')):
+            deltas[row['account_id']][0] += row['net']
+
+    # Transações futuras já gravadas (inclui as filhas das recorrências)
+    future = (
+        Transaction.objects.filter(user=user, account__user=user, date__gt=start_date, date__lte=end_date)
+        .values('account_id', 'date').annotate(net=SIGNED_AMOUNT)
+    )
+    for row in future:
+        deltas[row['account_id']][(row['date'] - start_date).days] += row['net']
+
+    # Recorrências além da última filha gravada (as filhas cobrem só 2 anos)
+    latest_child = Transaction.objects.filter(parent_transaction=OuterRef('pk')).order_by('-date')
+    templates = (
+        Transaction.objects.filter(user=user, is_recurring=True, recurrence_interval__isnull=False)
+        .annotate(
+            last_date=Max('recurrences__date'),
+            materialized=Count('recurrences'),
+            last_amount=Subquery(latest_child.values('amount')[:1]),
+            last_account=Subquery(latest_child.values('account_id')[:1]),
+        )
+        .select_related('category')
+    )
+    for template in templates:
+        after = max(template.last_date or template.date, start_date)
+        if after >= end_date:
+            continue
+        rule = RecurrenceRule.for_transaction(template)
+        account_id = template.last_account or template.account_id
+        amount = template.last_amount if template.last_amount is not None else template.amount
+        if account_id not in deltas:
+            continue
+        if template.category.type == 'expense':
+            amount = -amount
+        for occurrence in rule.between(after + timedelta(days=1), end_date):
+            deltas[account_id][(occurrence - start_date).days] += amount
+
+    # Cada conta fica na sua moeda; o total vai para a moeda base pela cotação de start_date
+    curves = []
+    total = [Decimal(0)] * (days + 1)
+    for account in accounts:
+        balances = list(accumulate(deltas[account['id']]))
+        rate = get_rate(account['currency'], start_date)
+        total = [a + b * rate for a, b in zip(total, balances)]
+        curves.append({
+            'id': account['id'],
+            'name': account['name'],
+            'currency': account['currency'],
+            'balances': [float(value) for value in balances],
+        })
+
+    return {
+        'start_date': start_date,
+        'end_date': end_date,
+        'dates': [start_date + timedelta(days=offset) for offset in range(days + 1)],
+        'accounts': curves,
+        'currency': settings.BASE_CURRENCY,
+        'total': [float(value) for value in total],
+    }
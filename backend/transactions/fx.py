@@ -0,0 +1,84 @@
+import threading
+import time
+from bisect import bisect_right
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Account, ExchangeRate
+
+RATE_FIELD = DecimalField(max_digits=18, decimal_places=8)
+AMOUNT_FIELD = DecimalField(max_digits=20, decimal_places=2)
+
+
+# --- Conversão dentro das queries ---
+
+def rate_expression(currency_ref, date_ref):
+    """
+    Cotação da moeda 'currency_ref' na data 'date_ref' (a mais recente até a data;
+    antes da primeira cotação, usa a primeira). Moeda base e moedas sem cotação = 1.
+    'date_ref' pode ser o nome de um campo da query externa ou uma data fixa.
+    """
+    rates = ExchangeRate.objects.filter(currency=OuterRef(currency_ref))
+    day = OuterRef(date_ref) if isinstance(date_ref, str) else date_ref
+    on_or_before = rates.filter(date__lte=day).order_by('-date').values('rate')[:1]
+    earliest = rates.order_by('date').values('rate')[:1]
+    return Coalesce(
+        Subquery(on_or_before, output_field=RATE_FIELD),
+        Subquery(earliest, output_field=RATE_FIELD),
+        Value(Decimal(1), output_field=RATE_FIELD),
+    )
+
+
+def converted(field, currency_ref, date_ref):
+    """Expressão SQL 'field * cotação' para somar valores na moeda base."""
+    return ExpressionWrapper(F(field) * rate_expression(currency_ref, date_ref), output_field=AMOUNT_FIELD)
+
+
+def has_foreign_accounts(user):
+    return Account.objects.filter(user=user).exclude(currency=settings.BASE_CURRENCY).exists()
+
+
+# --- Cache em memória para conversões pontuais no Python ---
+
+_lock = threading.Lock()
+_rates = {}
+_loaded_at = None
+
+
+def _load():
+    global _rates, _loaded_at
+    rates = {}
+    for currency, day, rate in ExchangeRate.objects.order_by('currency', 'date').values_list('currency', 'date', 'rate'):
+        dates, values = rates.setdefault(currency, ([], []))
+        dates.append(day)
+        values.append(rate)
+    _rates = rates
+    _loaded_at = time.monotonic()
+
+
+def clear_rate_cache():
+    global _loaded_at
+    with _lock:
+        _loaded_at = None
+
+
+def get_rate(currency, day):
+    """Mesma regra do rate_expression, via busca binária na tabela em memória."""
+    if currency == settings.BASE_CURRENCY:
+        return Decimal(1)
+    with _lock:
+        if _loaded_at is None or time.monotonic() - _loaded_at > settings.FX_CACHE_TTL:
+            _load()
+        series = _rates.get(currency)
+    if not series:
+        return Decimal(1)
+    dates, values = series
+    index = bisect_right(dates, day) - 1
+    return values[max(index, 0)]
+
+
+def convert(amount, currency, day):
+    return amount * get_rate(currency, day)
@@ -0,0 +1,196 @@
+import calendar
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import OuterRef, Subquery
+
+from .archive import Ledger
+from .fx import converted
+from .models import Account, Category, ClosedPeriod, ExchangeRate, Tombstone, Transaction
+
+# Escore robusto (MAD) acima do qual um lançamento é considerado atípico,
+# e o mínimo de lançamentos na categoria para que o escore faça sentido.
+OUTLIER_THRESHOLD = 3.5
+OUTLIER_MIN_SAMPLES = 4
+MAX_OUTLIERS = 50
+
+
+def _latest(queryset, field):
+    return Subquery(queryset.order_by(f'-{field}').values(field)[:1])
+
+
+def data_version(user):
+    """
+    Muda sempre que algo usado nos insights muda: transações (criadas, alteradas
+    ou excluídas), categorias, contas, cotações ou o período fechado. Uma query.
+    """
+    owner = OuterRef('pk')
+    versions = User.objects.filter(pk=user.pk).values(
+        last_transaction=_latest(Transaction.objects.filter(user=owner), 'updated_at'),
+        last_delete=_latest(Tombstone.objects.filter(user=owner, model='transactions'), 'deleted_at'),
+        last_category=_latest(Category.objects.filter(user=owner), 'updated_at'),
+        last_account=_latest(Account.objects.filter(user=owner), 'updated_at'),
+        last_rate=_latest(ExchangeRate.objects.all(), 'updated_at'),
+        closed_through=_latest(ClosedPeriod.objects.filter(user=owner), 'closed_through'),
+    ).first() or {}
+    return ':'.join(str(value.timestamp() if hasattr(value, 'timestamp') else value) for value in versions.values())
+
+
+def get_insights(user, today, months=12, window=3):
+    key = f"insights:{user.pk}:{months}:{window}:{today.isoformat()}:{data_version(user)}"
+    insights = cache.get(key)
+    if insights is None:
+        insights = build_insights(user, today, months, window)
+        cache.set(key, insights, 60 * 60 * 24)
+    return insights
+
+
+def _month_index(day):
+    return day.year * 12 + day.month - 1
+
+
+def _to_list(array):
+    # NaN não existe em JSON
+    return [None if np.isnan(value) else round(float(value), 2) for value in array]
+
+
+def _group_median(sorted_values, starts, counts):
+    low = starts + (counts - 1) // 2
+    high = starts + counts // 2
+    return (sorted_values[low] + sorted_values[high]) / 2
+
+
+def build_insights(user, today, months=12, window=3):
+    """
+    Estatísticas de gasto por categoria de despesa nos últimos 'months' meses
+    (incluindo o atual): média e desvio móveis, tendência mensal, projeção do
+    mês corrente e lançamentos atípicos. Tudo é calculado em matrizes NumPy
+    (categorias x meses), sem laços em Python sobre as linhas.
+    """
+    ledger = Ledger(user)
+    first_month = today.replace(day=1) - relativedelta(months=months - 1)
+    last_day = today.replace(day=calendar.monthrange(today.year, today.month)[1])
+    period = {'category__type': 'expense', 'date__gte': first_month, 'date__lte': last_day}
+    labels = [(first_month + relativedelta(months=offset)).strftime('%Y-%m') for offset in range(months)]
+
+    rows = ledger.monthly_by(('category_id', 'category__name'), **period)
+    if not rows:
+        return {'months': labels, 'categories': [], 'outliers': []}
+
+    # --- Matriz categorias x meses ---
+    category_ids = np.fromiter((row['category_id'] for row in rows), dtype=np.int64, count=len(rows))
+    month_columns = np.fromiter((_month_index(row['month']) for row in rows), dtype=np.int64, count=len(rows)) - _month_index(first_month)
+    totals = np.fromiter((row['total'] for row in rows), dtype=np.float64, count=len(rows))
+    names = {row['category_id']: row['category__name'] for row in rows}
+
+    unique_ids, category_rows = np.unique(category_ids, return_inverse=True)
+    spend = np.zeros((len(unique_ids), months))
+    np.add.at(spend, (category_rows, month_columns), totals)
+
+    # --- Média e desvio móveis (janela de 'window' meses) via somas acumuladas ---
+    rolling_mean = np.full_like(spend, np.nan)
+    rolling_std = np.full_like(spend, np.nan)
+    if months >= window:
+        padded = np.pad(spend, ((0, 0), (1, 0)))
+        sums = np.cumsum(padded, axis=1)
+        squares = np.cumsum(padded ** 2, axis=1)
+        mean = (sums[:, window:] - sums[:, :-window]) / window
+        variance = (squares[:, window:] - squares[:, :-window]) / window - mean ** 2
+        rolling_mean[:, window - 1:] = mean
+        rolling_std[:, window - 1:] = np.sqrt(np.clip(variance, 0, None))
+
+    # --- Tendência: inclinação (mínimos quadrados) dos meses já fechados ---
+    history = spend[:, :-1]
+    if history.shape[1] >= 2:
+        x = np.arange(history.shape[1], dtype=np.float64)
+        x -= x.mean()
+        slope = (history - history.mean(axis=1, keepdims=True)) @ x / (x @ x)
+    else:
+        slope = np.zeros(len(unique_ids))
+
+    # --- Projeção do mês corrente e comparação com o histórico ---
+    days_in_month = calendar.monthrange(today.year, today.month)[1]
+    current = spend[:, -1]
+    projected = current * days_in_month / today.day
+    history_mean = history.mean(axis=1) if history.shape[1] else np.zeros(len(unique_ids))
+    history_std = history.std(axis=1) if history.shape[1] else np.zeros(len(unique_ids))
+    projection_z = np.divide(projected - history_mean, history_std, out=np.zeros_like(projected), where=history_std > 0)
+
+    order = np.argsort(-spend.sum(axis=1))
+    categories = [
+        {
+            'id': int(unique_ids[index]),
+            'name': names[int(unique_ids[index])],
+            'monthly_spend': _to_list(spend[index]),
+            'rolling_mean': _to_list(rolling_mean[index]),
+            'rolling_std': _to_list(rolling_std[index]),
+            'trend_slope': round(float(slope[index]), 2),
+            'current_month': round(float(current[index]), 2),
+            'projected_month_end': round(float(projected[index]), 2),
+            'projection_zscore': round(float(projection_z[index]), 2),
+        }
+        for index in order
+    ]
+
+    return {
+        'months': labels,
+        'window': window,
+        'categories': categories,
+        'outliers': _outliers(ledger, period),
+    }
+
+
+def _outliers(ledger, period):
+    """Lançamentos atípicos por categoria: escore robusto pela mediana e MAD."""
+    queryset = ledger.transactions(**period)
+    if ledger.convert:
+        queryset = queryset.annotate(value=converted('amount', 'account__currency', 'date'))
+        fields = ('id', 'category_id', 'value')
+    else:
+        fields = ('id', 'category_id', 'amount')
+    data = list(queryset.values_list(*fields))
+    if not data:
+        return []
+
+    ids = np.array([row[0] for row in data], dtype=np.int64)
+    amounts = np.array([row[2] for row in data], dtype=np.float64)
+    _, groups = np.unique(np.array([row[1] for row in data], dtype=np.int64), return_inverse=True)
+
+    counts = np.bincount(groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    # Mediana por categoria: ordena por (categoria, valor) e pega o meio de cada bloco
+    order = np.lexsort((amounts, groups))
+    median = _group_median(amounts[order], starts, counts)
+    deviation = np.abs(amounts - median[groups])
+    order = np.lexsort((deviation, groups))
+    mad = _group_median(deviation[order], starts, counts)
+
+    # Sem dispersão pela MAD (muitos valores iguais), usa o z-score clássico
+    mean = np.bincount(groups, weights=amounts) / counts
+    std = np.sqrt(np.clip(np.bincount(groups, weights=amounts ** 2) / counts - mean ** 2, 0, None))
+    robust = np.divide(0.6745 * (amounts - median[groups]), mad[groups], out=np.zeros_like(amounts), where=mad[groups] > 0)
+    classic = np.divide(amounts - mean[groups], std[groups], out=np.zeros_like(amounts), where=std[groups] > 0)
+    score = np.where(mad[groups] > 0, robust, classic)
+
+    flagged = np.nonzero((score > OUTLIER_THRESHOLD) & (counts[groups] >= OUTLIER_MIN_SAMPLES))[0]
+    flagged = flagged[np.argsort(-score[flagged])][:MAX_OUTLIERS]
+    if not len(flagged):
+        return []
+
+    scores = dict(zip(ids[flagged].tolist(), score[flagged].tolist()))
+    details = Transaction.objects.filter(pk__in=scores).select_related('category')
+    outliers = [
+        {
+            'id': transaction.pk,
+            'description': transaction.description,
+            'date': transaction.date,
+            'amount': transaction.amount,
+            'category': transaction.category.name,
+            'score': round(scores[transaction.pk], 2),
+        }
+        for transaction in details
+    ]
+    return sorted(outliers, key=lambda item: item['score'], reverse=True)
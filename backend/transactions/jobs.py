@@ -0,0 +1,97 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction as db_transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Fila de tarefas simples, guardada no próprio banco (modelo Job) e executada
+# pelo comando 'manage.py run_jobs'. Não depende de broker externo.
+TASKS = {}
+
+
+def task(kind):
+    """Registra a função como tarefa da fila com o nome 'kind'."""
+    def register(func):
+        TASKS[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, payload, user=None, key=None):
+    """
+    Enfileira uma tarefa e retorna o Job. Se 'key' já foi usada, retorna o Job
+    existente em vez de criar outro (idempotência).
+    """
+    if kind not in TASKS:
+        raise ValueError(f"Tarefa desconhecida: {kind}")
+    if key:
+        existing = Job.objects.filter(idempotency_key=key).first()
+        if existing:
+            return existing
+    try:
+        with db_transaction.atomic():
+            job = Job.objects.create(kind=kind, payload=payload, user=user, idempotency_key=key or None)
+    except IntegrityError:
+        # Outra requisição com a mesma chave chegou primeiro
+        return Job.objects.get(idempotency_key=key)
+
+    if getattr(settings, 'JOBS_EAGER', False):
+        # Em desenvolvimento/testes a tarefa roda na hora, sem worker
+        db_transaction.on_commit(lambda: run_job(job))
+    return job
+
+
+def _claim(job_id):
+    # UPDATE condicional: só um worker consegue passar o Job de 'pending' para 'running'
+    return Job.objects.filter(pk=job_id, status='pending').update(
+        status='running', started_at=timezone.now(), attempts=F('attempts') + 1
+    ) == 1
+
+
+def claim_next_job():
+    """Reserva o próximo Job pendente (seguro com vários workers)."""
+    pending = Job.objects.filter(status='pending', run_after__lte=timezone.now()).order_by('run_after', 'id')
+    for job_id in pending.values_list('id', flat=True)[:10]:
+        if _claim(job_id):
+            return Job.objects.get(pk=job_id)
+    return None
+
+
+def run_job(job):
+    if job.status == 'pending':
+        if not _claim(job.pk):
+            return job
+        job.refresh_from_db()
+
+    try:
+        result = TASKS[job.kind](**job.payload)
+    except Exception:
+        logger.exception("Falha na tarefa %s #%s", job.kind, job.pk)
+        job.error = traceback.format_exc()
+        if job.attempts < getattr(settings, 'JOBS_MAX_ATTEMPTS', 3):
+            # Nova tentativa com espera crescente
+            job.status = 'pending'
+            job.run_after = timezone.now() + timedelta(seconds=30 * 2 ** job.attempts)
+        else:
+            job.status = 'failed'
+            job.finished_at = timezone.now()
+    else:
+        job.status = 'done'
+        job.result = result
+        job.error = ''
+        job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'error', 'run_after', 'finished_at'])
+    return job
+
+
+def requeue_stale_jobs(timeout):
+    """Devolve à fila os Jobs 'running' de workers que morreram no meio da execução."""
+    limit = timezone.now() - timedelta(seconds=timeout)
+    return Job.objects.filter(status='running', started_at__lt=limit).update(status='pending', run_after=timezone.now())
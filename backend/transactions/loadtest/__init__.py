@@ -0,0 +1,2 @@
+# Teste de carga da API inteira (servidor WSGI ou ASGI no próprio processo,
+# banco de teste populado e cenários de uso). Executado por 'manage.py load_test'.
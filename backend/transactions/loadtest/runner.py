@@ -0,0 +1,88 @@
+import json
+import statistics
+import threading
+import time
+from collections import defaultdict
+
+from .scenarios import SCENARIOS
+
+
+def get_token(transport, user):
+    status, body, _ = transport.request('POST', '/api/token/', {'username': user.username, 'password': user.password})
+    if status != 200:
+        raise RuntimeError(f'Login de {user.username} falhou ({status}).')
+    return json.loads(body)['access']
+
+
+def run_scenario(transport, scenario, users, tokens, iterations):
+    """
+    Cada usuário virtual roda numa thread e repete o cenário 'iterations' vezes;
+    todos começam juntos. Retorna as amostras (passo, ms, status, queries) e o tempo total.
+    """
+    build_steps = SCENARIOS[scenario]
+    samples = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(len(users) + 1)
+
+    def virtual_user(user):
+        own = []
+        barrier.wait()
+        for _ in range(iterations):
+            for step in build_steps(user):
+                headers = {'Authorization': f'Bearer {tokens[user.username]}'} if step.auth else {}
+                started = time.perf_counter()
+                try:
+                    status, _, queries = transport.request(step.method, step.path, step.body, headers)
+                except Exception:
+                    status, queries = None, 0
+                own.append((step.label, (time.perf_counter() - started) * 1000, status, queries))
+        with lock:
+            samples.extend(own)
+
+    threads = [threading.Thread(target=virtual_user, args=(user,)) for user in users]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def percentile(sorted_values, percent):
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    return statistics.quantiles(sorted_values, n=100, method='inclusive')[percent - 1]
+
+
+def summarize(samples, elapsed=None):
+    latencies = sorted(sample[1] for sample in samples)
+    errors = sum(1 for sample in samples if sample[2] is None or sample[2] >= 400)
+    summary = {
+        'requests': len(samples),
+        'errors': errors,
+        'mean': statistics.mean(latencies),
+        'p50': percentile(latencies, 50),
+        'p90': percentile(latencies, 90),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'max': latencies[-1],
+        'queries': statistics.mean(sample[3] for sample in samples),
+    }
+    if elapsed:
+        summary['throughput'] = len(samples) / elapsed
+    return summary
+
+
+def summarize_steps(samples):
+    by_step = defaultdict(list)
+    for sample in samples:
+        by_step[sample[0]].append(sample)
+    return {label: summarize(step_samples) for label, step_samples in by_step.items()}
+
+
+def status_counts(samples):
+    counts = defaultdict(int)
+    for sample in samples:
+        counts[sample[2] or 'falha'] += 1
+    return dict(counts)
@@ -0,0 +1,47 @@
+import random
+from collections import namedtuple
+
+from django.utils import timezone
+
+# Uma requisição de um cenário; 'auth' = enviar o token JWT do usuário virtual
+Step = namedtuple('Step', ['label', 'method', 'path', 'body', 'auth'])
+
+ANALYTICS_PERIODS = ['this_month', 'last_month', 'last_90_days', 'this_year']
+
+
+def login(user):
+    return [Step('token', 'POST', '/api/token/', {'username': user.username, 'password': user.password}, False)]
+
+
+def dashboard(user):
+    return [
+        Step('dashboard', 'GET', '/api/dashboard/', None, True),
+        Step('notifications', 'GET', '/api/notifications/', None, True),
+    ]
+
+
+def analytics(user):
+    # O usuário alterna entre os períodos do dashboard de análise
+    return [Step(f'analytics {period}', 'GET', f'/api/analytics/?period={period}', None, True) for period in ANALYTICS_PERIODS]
+
+
+def recurring(user):
+    body = {
+        'description': 'Assinatura (teste de carga)',
+        'amount': f'{random.randint(1000, 20000) / 100:.2f}',
+        'date': timezone.now().date().isoformat(),
+        'category': user.expense_category_id,
+        'account': user.account_id,
+        'is_recurring': True,
+        'recurrence_interval': 'monthly',
+        'recurrence_count': 12,
+    }
+    return [Step('create recurring', 'POST', '/api/transactions/', body, True)]
+
+
+SCENARIOS = {
+    'login': login,
+    'dashboard': dashboard,
+    'analytics': analytics,
+    'recurring': recurring,
+}
@@ -0,0 +1,69 @@
+import random
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from ..models import Account, Category, Transaction
+
+PASSWORD = 'loadtest-senha'
+
+INCOME_CATEGORIES = ['Salário', 'Freelance']
+EXPENSE_CATEGORIES = ['Mercado', 'Aluguel', 'Transporte', 'Lazer', 'Saúde', 'Contas']
+ACCOUNTS = ['Conta Corrente', 'Cartão de Crédito']
+
+# Dados de cada usuário virtual usados pelos cenários
+VirtualUser = namedtuple('VirtualUser', ['username', 'password', 'account_id', 'expense_category_id'])
+
+
+def seed_users(count, transactions_per_user, prefix='loadtest', seed=42):
+    """
+    Cria 'count' usuários ('<prefix>-1', '<prefix>-2', ...) com contas, categorias e
+    'transactions_per_user' transações espalhadas pelo último ano e pelo próximo mês.
+    """
+    rng = random.Random(seed)
+    today = timezone.now().date()
+    # O hash da senha é caro de propósito; calculado uma vez e reaproveitado
+    password_hash = make_password(PASSWORD)
+    # Nem todo banco devolve os ids no bulk_create (MySQL): os objetos são lidos de volta
+    usernames = [f'{prefix}-{index}' for index in range(1, count + 1)]
+    User.objects.bulk_create([User(username=username, password=password_hash) for username in usernames])
+    users = list(User.objects.filter(username__in=usernames).order_by('pk'))
+    Account.objects.bulk_create([Account(user=user, name=name) for user in users for name in ACCOUNTS])
+    Category.objects.bulk_create([
+        Category(user=user, name=name, type=category_type)
+        for user in users
+        for category_type, names in (('income', INCOME_CATEGORIES), ('expense', EXPENSE_CATEGORIES))
+        for name in names
+    ])
+    accounts_by_user, categories_by_user = defaultdict(list), defaultdict(list)
+    for account in Account.objects.filter(user__in=users).order_by('pk'):
+        accounts_by_user[account.user_id].append(account)
+    for category in Category.objects.filter(user__in=users).order_by('pk'):
+        categories_by_user[category.user_id].append(category)
+
+    virtual_users = []
+    for user in users:
+        accounts = accounts_by_user[user.pk]
+        income = [category for category in categories_by_user[user.pk] if category.type == 'income']
+        expense = [category for category in categories_by_user[user.pk] if category.type == 'expense']
+
+        rows = []
+        for _ in range(transactions_per_user):
+            is_income = rng.random() < 0.15
+            day = today + timedelta(days=rng.randint(-365, 30))
+            rows.append(Transaction(
+                user=user,
+                account=rng.choice(accounts),
+                category=rng.choice(income if is_income else expense),
+                description=rng.choice(['Pagamento', 'Compra', 'Transferência', 'Assinatura', 'Mensalidade']),
+                amount=Decimal(rng.randint(500, 500000 if is_income else 60000)) / 100,
+                date=day,
+                paid=day <= today,
+            ))
+        Transaction.objects.bulk_create(rows, batch_size=1000)
+        virtual_users.append(VirtualUser(user.username, PASSWORD, accounts[0].pk, expense[0].pk))
+    return virtual_users
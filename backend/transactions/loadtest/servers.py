@@ -0,0 +1,159 @@
+import asyncio
+import http.client
+import json
+import threading
+from contextlib import ExitStack
+
+from django.core.asgi import get_asgi_application
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+
+QUERY_COUNT_HEADER = 'X-DB-Queries'
+QUERY_COUNT_MIDDLEWARE = 'transactions.loadtest.servers.QueryCountMiddleware'
+
+
+class QueryCountMiddleware:
+    """Conta as queries de cada requisição (em todos os bancos) e devolve no header X-DB-Queries."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        count = 0
+
+        def counter(execute, sql, params, many, context):
+            nonlocal count
+            count += 1
+            return execute(sql, params, many, context)
+
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(counter))
+            response = self.get_response(request)
+        response[QUERY_COUNT_HEADER] = str(count)
+        return response
+
+
+def _encode(body, headers):
+    headers = dict(headers)
+    if body is None:
+        return b'', headers
+    headers['Content-Type'] = 'application/json'
+    return json.dumps(body).encode(), headers
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class WSGITransport:
+    """Servidor WSGI com threads (o mesmo do runserver) numa porta local; uma thread por requisição."""
+
+    name = 'wsgi'
+
+    def __init__(self, host):
+        self.host = host
+
+    def __enter__(self):
+        self.server = ThreadedWSGIServer(('127.0.0.1', 0), _QuietHandler, allow_reuse_address=True)
+        self.server.set_app(get_wsgi_application())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def request(self, method, path, body=None, headers=()):
+        """Retorna (status, corpo, queries no banco)."""
+        payload, headers = _encode(body, headers)
+        headers['Host'] = self.host
+        connection = http.client.HTTPConnection('127.0.0.1', self.server.server_address[1], timeout=60)
+        try:
+            connection.request(method, path, body=payload, headers=headers)
+            response = connection.getresponse()
+            return response.status, response.read(), int(response.getheader(QUERY_COUNT_HEADER, 0))
+        finally:
+            connection.close()
+
+
+class ASGITransport:
+    """
+    Aplicação ASGI chamada diretamente num event loop próprio (sem socket),
+    como faria um servidor ASGI de um único processo: as requisições dos
+    usuários virtuais são agendadas no mesmo loop.
+    """
+
+    name = 'asgi'
+
+    def __init__(self, host):
+        self.host = host
+
+    def __enter__(self):
+        self.application = get_asgi_application()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    def request(self, method, path, body=None, headers=()):
+        """Retorna (status, corpo, queries no banco)."""
+        return asyncio.run_coroutine_threadsafe(self._call(method, path, body, headers), self.loop).result()
+
+    async def _call(self, method, path, body, headers):
+        payload, headers = _encode(body, headers)
+        headers['Host'] = self.host
+        headers['Content-Length'] = str(len(payload))
+        path, _, query = path.partition('?')
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': method,
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': query.encode(),
+            'root_path': '',
+            'headers': [(key.lower().encode(), value.encode()) for key, value in headers.items()],
+            'client': ('127.0.0.1', 0),
+            'server': (self.host, 80),
+        }
+        messages = [{'type': 'http.request', 'body': payload, 'more_body': False}]
+        disconnected = asyncio.Event()
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            # O cliente nunca desconecta antes da resposta
+            await disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        response = {'status': None, 'headers': {}, 'body': []}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+                response['headers'] = {key.decode().lower(): value.decode() for key, value in message.get('headers', [])}
+            elif message['type'] == 'http.response.body':
+                response['body'].append(message.get('body', b''))
+
+        await self.application(scope, receive, send)
+        disconnected.set()
+        queries = int(response['headers'].get(QUERY_COUNT_HEADER.lower(), 0))
+        return response['status'], b''.join(response['body']), queries
+
+
+TRANSPORTS = {
+    'wsgi': WSGITransport,
+    'asgi': ASGITransport,
+}
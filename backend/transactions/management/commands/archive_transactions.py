@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from transactions.archive import archive_user
+from transactions.jobs import enqueue
+
+
+class Command(BaseCommand):
+    help = (
+        "Fecha os meses antigos: consolida as transações em resumos mensais por "
+        "conta e categoria e, opcionalmente, move as linhas para o arquivo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep-months', type=int, default=13,
+            help='Meses mais recentes que continuam abertos (padrão: 13, cobre todos os períodos das análises).',
+        )
+        parser.add_argument('--user', help='Arquiva apenas este usuário (username).')
+        parser.add_argument('--move', action='store_true', help='Move as transações fechadas para ArchivedTransaction.')
+        parser.add_argument('--defer', action='store_true', help='Enfileira um Job por usuário em vez de arquivar agora.')
+
+    def handle(self, *args, **options):
+        if options['keep_months'] < 1:
+            raise CommandError('--keep-months deve ser pelo menos 1.')
+        first_open_month = timezone.now().date().replace(day=1) - relativedelta(months=options['keep_months'] - 1)
+        cutoff = first_open_month - timedelta(days=1)
+
+        users = User.objects.all()
+        if options['user']:
+            users = users.filter(username=options['user'])
+            if not users.exists():
+                raise CommandError(f"Usuário '{options['user']}' não encontrado.")
+
+        for user in users.iterator():
+            if options['defer']:
+                enqueue('archive_user', {'user_id': user.pk, 'cutoff': cutoff.isoformat(), 'move': options['move']}, user=user)
+                continue
+            created, moved = archive_user(user, cutoff, move=options['move'])
+            if created or moved:
+                self.stdout.write(f"{user.username}: {created} resumos mensais, {moved} transações movidas (até {cutoff}).")
+        if options['defer']:
+            self.stdout.write(self.style.SUCCESS(f'Arquivamento até {cutoff} enfileirado (rode o run_jobs).'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Períodos fechados até {cutoff}.'))
@@ -0,0 +1,83 @@
+import importlib.util
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from rest_framework.test import APIClient
+
+from transactions.management.utils import request_host
+
+
+class Command(BaseCommand):
+    help = "Mede a latência por requisição sem reaproveitamento de conexões, com conexões persistentes e com o pool nativo (se disponível)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requisições por cenário.')
+        parser.add_argument('--path', default='/api/dashboard/', help='Endpoint (GET) a ser medido.')
+        parser.add_argument('--username', help='Usuário autenticado nas requisições (padrão: o primeiro).')
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options['username']).first() if options['username'] else User.objects.order_by('pk').first()
+        if user is None:
+            raise CommandError('Nenhum usuário encontrado para autenticar as requisições.')
+
+        connection = connections[options['database']]
+        settings_dict = connection.settings_dict
+        original_max_age = settings_dict['CONN_MAX_AGE']
+        original_options = dict(settings_dict.get('OPTIONS', {}))
+        options_without_pool = {k: v for k, v in original_options.items() if k != 'pool'}
+
+        client = APIClient(HTTP_HOST=request_host())
+        client.force_authenticate(user)
+
+        # O pool não aceita conexões persistentes, então ele é medido com CONN_MAX_AGE=0
+        scenarios = [
+            ('sem reaproveitamento', 0, options_without_pool),
+            ('conexões persistentes', original_max_age or 600, options_without_pool),
+        ]
+        if self._supports_pool(connection):
+            scenarios.append(('pool nativo', 0, {**options_without_pool, 'pool': original_options.get('pool') or True}))
+        else:
+            self.stdout.write(f"Pool nativo indisponível para {settings_dict['ENGINE']}; cenário ignorado.")
+        self.stdout.write(f"Banco: {settings_dict['ENGINE']} | endpoint: {options['path']} | {options['requests']} requisições por cenário")
+        try:
+            for label, max_age, db_options in scenarios:
+                connection.close()
+                settings_dict['CONN_MAX_AGE'] = max_age
+                settings_dict['OPTIONS'] = db_options
+                # Aquecimento: a primeira requisição paga imports e caches.
+                self._timed_request(client, options['path'])
+                timings = [self._timed_request(client, options['path']) for _ in range(options['requests'])]
+                self._report(label, timings)
+                if db_options.get('pool'):
+                    connection.close_pool()
+        finally:
+            connection.close()
+            settings_dict['CONN_MAX_AGE'] = original_max_age
+            settings_dict['OPTIONS'] = original_options
+
+    def _supports_pool(self, connection):
+        # Django 5.1+: PostgreSQL com psycopg 3 e o pacote psycopg_pool
+        return connection.vendor == 'postgresql' and hasattr(connection, 'close_pool') and importlib.util.find_spec('psycopg_pool') is not None
+
+    def _timed_request(self, client, path):
+        # O test client desliga o close_old_connections dos sinais de request,
+        # então reproduzimos aqui o ciclo de conexões do handler WSGI.
+        started = time.perf_counter()
+        close_old_connections()
+        response = client.get(path)
+        close_old_connections()
+        elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code != 200:
+            raise CommandError(f'{path} respondeu {response.status_code}.')
+        return elapsed
+
+    def _report(self, label, timings):
+        p95 = statistics.quantiles(timings, n=20)[18] if len(timings) > 1 else timings[0]
+        self.stdout.write(
+            f"{label}: média {statistics.mean(timings):.2f} ms | "
+            f"p50 {statistics.median(timings):.2f} ms | p95 {p95:.2f} ms"
+        )
@@ -0,0 +1,15 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from transactions.notifications import rebuild_feed
+
+
+class Command(BaseCommand):
+    help = "Remonta o feed de contas a vencer de todos os usuários (rodar uma vez por dia, logo após a meia-noite)."
+
+    def handle(self, *args, **options):
+        count = 0
+        for user in User.objects.filter(is_active=True).iterator():
+            rebuild_feed(user)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f'Notificações atualizadas para {count} usuário(s).'))
@@ -0,0 +1,53 @@
+import csv
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router
+
+from transactions.budgets import invalidate_goals
+from transactions.fx import clear_rate_cache
+from transactions.models import ExchangeRate
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa cotações de um CSV com as colunas date,currency,rate (rate = valor de "
+        "1 unidade da moeda na moeda base). Cotações já existentes são atualizadas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Arquivo CSV com as cotações.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], newline='', encoding='utf-8') as csv_file:
+                rates = [self._parse(line_number, row) for line_number, row in enumerate(csv.DictReader(csv_file), start=2)]
+        except OSError as exc:
+            raise CommandError(f'Não foi possível ler o arquivo: {exc}')
+
+        # MySQL (ON DUPLICATE KEY UPDATE) não aceita indicar o alvo do conflito:
+        # usa qualquer chave única, e a única de ExchangeRate é (currency, date)
+        upsert = {'update_conflicts': True, 'update_fields': ['rate', 'updated_at']}
+        if connections[router.db_for_write(ExchangeRate)].features.supports_update_conflicts_with_target:
+            upsert['unique_fields'] = ['currency', 'date']
+        ExchangeRate.objects.bulk_create(rates, batch_size=options['batch_size'], **upsert)
+        clear_rate_cache()
+        # Gastos das metas somados com as cotações antigas são recalculados na próxima leitura
+        invalidate_goals()
+        currencies = sorted({rate.currency for rate in rates})
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(rates)} cotações importadas ({', '.join(currencies) or 'nenhuma moeda'} -> {settings.BASE_CURRENCY})."
+        ))
+
+    def _parse(self, line_number, row):
+        try:
+            currency = row['currency'].strip().upper()
+            rate = ExchangeRate(currency=currency, date=date.fromisoformat(row['date'].strip()), rate=Decimal(row['rate'].strip()))
+        except (KeyError, AttributeError, ValueError, InvalidOperation):
+            raise CommandError(f'Linha {line_number} inválida: {row}')
+        if len(currency) != 3 or not currency.isalpha() or rate.rate <= 0:
+            raise CommandError(f'Linha {line_number} inválida: {row}')
+        return rate
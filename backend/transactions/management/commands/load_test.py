@@ -0,0 +1,86 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import override_settings, setup_databases, teardown_databases
+
+from transactions.loadtest.runner import get_token, run_scenario, status_counts, summarize, summarize_steps
+from transactions.loadtest.scenarios import SCENARIOS
+from transactions.loadtest.seed import seed_users
+from transactions.loadtest.servers import QUERY_COUNT_MIDDLEWARE, TRANSPORTS
+from transactions.management.utils import request_host
+
+
+class Command(BaseCommand):
+    help = (
+        "Teste de carga da API: sobe a aplicação no próprio processo (WSGI e/ou ASGI) sobre um "
+        "banco de teste populado e executa os cenários com usuários concorrentes. Com SQLite o "
+        "banco de teste é um arquivo temporário; nos demais bancos é o banco de teste do Django "
+        "(test_<nome>), criado e apagado ao final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--server', choices=['wsgi', 'asgi', 'both'], default='both')
+        parser.add_argument(
+            '--scenarios', default=','.join(SCENARIOS),
+            help=f"Cenários separados por vírgula ({', '.join(SCENARIOS)}).",
+        )
+        parser.add_argument('--concurrency', type=int, default=8, help='Usuários virtuais simultâneos.')
+        parser.add_argument('--iterations', type=int, default=10, help='Repetições do cenário por usuário.')
+        parser.add_argument('--transactions', type=int, default=500, help='Transações criadas por usuário.')
+
+    def handle(self, *args, **options):
+        scenarios = [name.strip() for name in options['scenarios'].split(',') if name.strip()]
+        unknown = [name for name in scenarios if name not in SCENARIOS]
+        if unknown:
+            raise CommandError(f"Cenários desconhecidos: {', '.join(unknown)}")
+        if options['concurrency'] < 1 or options['iterations'] < 1:
+            raise CommandError('--concurrency e --iterations devem ser maiores que zero.')
+        servers = ['wsgi', 'asgi'] if options['server'] == 'both' else [options['server']]
+        host = request_host()
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            connection = connections['default']
+            if connection.vendor == 'sqlite':
+                # Um arquivo (e não o SQLite em memória) para que as threads do servidor compartilhem o banco
+                connection.settings_dict['TEST']['NAME'] = os.path.join(tmp_dir, 'loadtest.sqlite3')
+                # Transações que leem e depois escrevem falham na hora com "database is locked"
+                # quando outra thread já está escrevendo; IMMEDIATE faz esperar pela vez (até o timeout).
+                connection.settings_dict['OPTIONS'].update({'transaction_mode': 'IMMEDIATE', 'timeout': 30})
+            old_config = setup_databases(verbosity=0, interactive=False)
+            try:
+                with override_settings(MIDDLEWARE=[QUERY_COUNT_MIDDLEWARE, *settings.MIDDLEWARE]):
+                    self.stdout.write(
+                        f"Banco: {connection.vendor} | {options['concurrency']} usuários virtuais, {options['transactions']} "
+                        f"transações cada | {options['iterations']} repetições por cenário"
+                    )
+                    for server in servers:
+                        # Usuários novos para cada servidor: o cenário 'recurring' grava transações
+                        users = seed_users(options['concurrency'], options['transactions'], prefix=f'loadtest-{server}')
+                        with TRANSPORTS[server](host) as transport:
+                            tokens = {user.username: get_token(transport, user) for user in users}
+                            for scenario in scenarios:
+                                samples, elapsed = run_scenario(transport, scenario, users, tokens, options['iterations'])
+                                self._report(server, scenario, samples, elapsed)
+            finally:
+                connections.close_all()
+                teardown_databases(old_config, verbosity=0)
+
+    def _report(self, server, scenario, samples, elapsed):
+        summary = summarize(samples, elapsed)
+        style = self.style.SUCCESS if not summary['errors'] else self.style.WARNING
+        self.stdout.write(style(
+            f"\n[{server}] {scenario}: {summary['requests']} requisições em {elapsed:.2f} s | "
+            f"{summary['throughput']:.1f} req/s | erros: {summary['errors']} {status_counts(samples)}"
+        ))
+        self.stdout.write(f"  total: {self._latencies(summary)}")
+        for label, step in summarize_steps(samples).items():
+            self.stdout.write(f"  {label}: {self._latencies(step)}")
+
+    def _latencies(self, summary):
+        return (
+            f"p50 {summary['p50']:.1f} | p90 {summary['p90']:.1f} | p95 {summary['p95']:.1f} | "
+            f"p99 {summary['p99']:.1f} | máx {summary['max']:.1f} ms | {summary['queries']:.1f} queries/req"
+        )
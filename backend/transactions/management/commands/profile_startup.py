@@ -0,0 +1,113 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from transactions.management.utils import request_host
+
+# Executado num processo novo (com -X importtime), como um worker recém-criado:
+# carrega a aplicação WSGI e atende uma única requisição.
+CHILD_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+ready = time.perf_counter()
+from wsgiref.util import setup_testing_defaults
+environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': sys.argv[1], 'HTTP_HOST': sys.argv[2]}
+if sys.argv[3]:
+    environ['HTTP_AUTHORIZATION'] = 'Bearer ' + sys.argv[3]
+setup_testing_defaults(environ)
+status = []
+b''.join(application(environ, lambda code, headers, exc_info=None: status.append(code)))
+done = time.perf_counter()
+print(json.dumps({'setup': ready - started, 'first_request': done - ready, 'status': status[0]}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede o boot de um worker: tempo de import por módulo e tempo até a primeira "
+        "requisição. Use --settings para comparar perfis (ex.: easyfinances_api.settings_production)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/dashboard/', help='Endpoint (GET) da primeira requisição.')
+        parser.add_argument(
+            '--user', help='Usuário autenticado na requisição (padrão: o primeiro cadastrado). Use --anonymous para não autenticar.',
+        )
+        parser.add_argument('--anonymous', action='store_true', help='Faz a requisição sem token.')
+        parser.add_argument('--runs', type=int, default=3, help='Processos medidos (os tempos são a mediana).')
+        parser.add_argument('--limit', type=int, default=20, help='Quantidade de módulos e pacotes listados.')
+
+    def handle(self, *args, **options):
+        host = request_host()
+        token = '' if options['anonymous'] else self._token(options['user'])
+        runs = [self._run(options['path'], host, token) for _ in range(max(options['runs'], 1))]
+
+        self.stdout.write(f"Configurações: {os.environ.get('DJANGO_SETTINGS_MODULE')} | {len(runs)} processo(s)")
+        self.stdout.write(f"Imports + django.setup(): {self._median(runs, 'setup'):.1f} ms")
+        self.stdout.write(
+            f"Primeira requisição (GET {options['path']} -> {runs[-1]['status']}): {self._median(runs, 'first_request'):.1f} ms"
+        )
+        self.stdout.write(f"Processo iniciado até a primeira resposta: {self._median(runs, 'total'):.1f} ms")
+
+        # O detalhamento por módulo vem do último processo
+        imports = runs[-1]['imports']
+        self.stdout.write("\nMódulos mais lentos (tempo acumulado, inclui o que cada um importa):")
+        for name, _, cumulative in sorted(imports, key=lambda item: item[2], reverse=True)[:options['limit']]:
+            self.stdout.write(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+        packages = defaultdict(int)
+        for name, own, _ in imports:
+            packages[name.split('.')[0]] += own
+        self.stdout.write("\nPor pacote (soma do tempo próprio dos módulos):")
+        for package, own in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:options['limit']]:
+            self.stdout.write(f"  {own / 1000:8.1f} ms  {package}")
+
+    def _token(self, username):
+        # Token gerado aqui (fora da medição); o processo medido só o valida, como numa requisição real
+        users = User.objects.filter(is_active=True)
+        user = users.filter(username=username).first() if username else users.order_by('pk').first()
+        if user is None:
+            raise CommandError(
+                f"Usuário '{username}' não encontrado." if username
+                else 'Nenhum usuário cadastrado para autenticar a requisição; use --user ou --anonymous.'
+            )
+        return str(AccessToken.for_user(user))
+
+    def _run(self, path, host, token):
+        started = time.perf_counter()
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', CHILD_SCRIPT, path, host, token],
+            cwd=settings.BASE_DIR, env=os.environ.copy(), capture_output=True, text=True,
+        )
+        total = time.perf_counter() - started
+        if process.returncode != 0:
+            raise CommandError(f"O processo de medição falhou:\n{process.stderr[-2000:]}")
+        result = json.loads(process.stdout.strip().splitlines()[-1])
+        result['total'] = total
+        result['imports'] = self._parse_importtime(process.stderr)
+        return result
+
+    def _parse_importtime(self, output):
+        # Linhas no formato "import time: <próprio us> | <acumulado us> | <módulo>"
+        imports = []
+        for line in output.splitlines():
+            if not line.startswith('import time:'):
+                continue
+            own, cumulative, name = line[len('import time:'):].split('|')
+            if own.strip().isdigit():
+                imports.append((name.strip(), int(own), int(cumulative)))
+        return imports
+
+    def _median(self, runs, key):
+        return statistics.median(run[key] for run in runs) * 1000
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from transactions.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = "Apaga os registros de exclusão (Tombstone) mais antigos que SYNC_TOMBSTONE_DAYS."
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(f'{prune_tombstones()} registro(s) de exclusão removido(s).'))
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from transactions.jobs import claim_next_job, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = "Worker da fila de tarefas: executa os Jobs pendentes (regeneração de séries, importações, arquivamento)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Esvazia a fila e sai, em vez de ficar aguardando.')
+        parser.add_argument('--sleep', type=float, default=2.0, help='Espera (s) entre verificações com a fila vazia.')
+        parser.add_argument('--stale-timeout', type=int, default=600, help="Segundos até um Job 'running' ser considerado abandonado.")
+
+    def handle(self, *args, **options):
+        self.stdout.write('Worker iniciado.')
+        last_requeue = 0
+        try:
+            while True:
+                # Mesmo ciclo de conexões de uma requisição (respeita CONN_MAX_AGE)
+                close_old_connections()
+                if time.monotonic() - last_requeue > 60:
+                    requeued = requeue_stale_jobs(options['stale_timeout'])
+                    if requeued:
+                        self.stdout.write(f'{requeued} tarefa(s) abandonada(s) devolvida(s) à fila.')
+                    last_requeue = time.monotonic()
+
+                job = claim_next_job()
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['sleep'])
+                    continue
+
+                job = run_job(job)
+                self.stdout.write(f'{job.kind} #{job.pk}: {job.get_status_display()}')
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write('Worker finalizado.')
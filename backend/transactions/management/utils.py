@@ -0,0 +1,6 @@
+from django.conf import settings
+
+
+def request_host():
+    """Host aceito pelo ALLOWED_HOSTS, para as requisições feitas pelos comandos de medição."""
+    return next((host.lstrip('.') for host in settings.ALLOWED_HOSTS if host != '*'), 'localhost')
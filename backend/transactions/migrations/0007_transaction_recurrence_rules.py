@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0006_transaction_is_recurring_transaction_paid_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='recurrence_count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='recurrence_every',
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='recurrence_interval',
+            field=models.CharField(blank=True, choices=[('daily', 'Diária'), ('weekly', 'Semanal'), ('biweekly', 'Quinzenal'), ('monthly', 'Mensal'), ('yearly', 'Anual'), ('business_day', 'N-ésimo dia útil do mês')], max_length=20, null=True),
+        ),
+    ]
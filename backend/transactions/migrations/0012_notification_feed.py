@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('transactions', '0011_job_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationFeed',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_feed', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('start_date', models.DateField()),
+                ('days', models.PositiveSmallIntegerField()),
+                ('items', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:04
+
+import django.core.validators
+import transactions.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0012_notification_feed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='currency',
+            field=models.CharField(default=transactions.models.default_currency, max_length=3, validators=[django.core.validators.RegexValidator('^[A-Z]{3}$', 'Use o código ISO da moeda, ex.: BRL, USD.')], verbose_name='Moeda'),
+        ),
+        migrations.CreateModel(
+            name='ExchangeRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('currency', models.CharField(max_length=3, validators=[django.core.validators.RegexValidator('^[A-Z]{3}$', 'Use o código ISO da moeda, ex.: BRL, USD.')], verbose_name='Moeda')),
+                ('date', models.DateField()),
+                ('rate', models.DecimalField(decimal_places=8, max_digits=18, verbose_name='Cotação')),
+            ],
+            options={
+                'unique_together': {('currency', 'date')},
+            },
+        ),
+    ]
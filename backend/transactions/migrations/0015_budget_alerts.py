@@ -0,0 +1,54 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0014_sync_updated_at_tombstones'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BudgetAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('threshold', models.PositiveSmallIntegerField(verbose_name='Limite (%)')),
+                ('spent_amount', models.DecimalField(decimal_places=2, max_digits=14, verbose_name='Valor Gasto')),
+                ('target_amount', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Valor Alvo')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='budgetgoal',
+            name='alert_level',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='Último Alerta (%)'),
+        ),
+        migrations.AddField(
+            model_name='budgetgoal',
+            name='spent_amount',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=14, null=True, verbose_name='Valor Gasto'),
+        ),
+        migrations.AddIndex(
+            model_name='budgetgoal',
+            index=models.Index(fields=['category', 'goal_type', 'end_date'], name='goal_category_window_idx'),
+        ),
+        migrations.AddField(
+            model_name='budgetalert',
+            name='goal',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to='transactions.budgetgoal'),
+        ),
+        migrations.AddField(
+            model_name='budgetalert',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='budget_alerts', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='budgetalert',
+            index=models.Index(fields=['user', 'created_at'], name='budget_alert_user_created_idx'),
+        ),
+    ]
@@ -1,8 +1,41 @@
-from django.db import models
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import models, router, transaction
 from django.contrib.auth.models import User
+from django.core.validators import RegexValidator
+from django.utils import timezone
 from django.conf import settings # É uma boa prática usar settings.AUTH_USER_MODEL
+from .recurrence import RECURRENCE_CHOICES
+
+CURRENCY_VALIDATOR = RegexValidator(r'^[A-Z]{3}$', 'Use o código ISO da moeda, ex.: BRL, USD.')
+
+def default_currency():
+    return settings.BASE_CURRENCY
+
+
+class SyncedQuerySet(models.QuerySet):
+    def delete(self, tombstones=True):
+        # tombstones=False apaga sem avisar os clientes (ex.: itens movidos para o arquivo)
+        with tombstone_batch(router.db_for_write(self.model), record=tombstones):
+            return super().delete()
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
+class SyncedModel(models.Model):
+    # Coleções da sincronização incremental (/api/sync/): as exclusões,
+    # inclusive em cascata, viram Tombstones gravados num único INSERT.
+    objects = SyncedQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+    def delete(self, using=None, keep_parents=False):
+        with tombstone_batch(using or router.db_for_write(self.__class__, instance=self)):
+            return super().delete(using=using, keep_parents=keep_parents)
 
-class Category(models.Model):
+class Category(SyncedModel):
     CATEGORY_TYPES = [
         ('expense', 'Despesa'),
         ('income', 'Receita'),
@@ -11,23 +44,33 @@ class Category(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='categories')
     name = models.CharField(max_length=100)
     type = models.CharField("Tipo", max_length=7, choices=CATEGORY_TYPES, default='expense')
+    # Data da última alteração, usada pela sincronização incremental (/api/sync/)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
     
     class Meta:
         unique_together = ('user', 'name')
+        indexes = [models.Index(fields=['user', 'updated_at'], name='category_user_updated_idx')]
 
-class Account(models.Model):
+class Account(SyncedModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='accounts')
     name = models.CharField(max_length=100)
     type = models.CharField(max_length=50, default='Conta Corrente') 
     balance = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    # Moeda da conta (ISO 4217); valores e saldo da conta estão nesta moeda
+    currency = models.CharField("Moeda", max_length=3, default=default_currency, validators=[CURRENCY_VALIDATOR])
+    # Data da última alteração, usada pela sincronização incremental (/api/sync/)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
 
-class Transaction(models.Model):
+    class Meta:
+        indexes = [models.Index(fields=['user', 'updated_at'], name='account_user_updated_idx')]
+
+class Transaction(SyncedModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='transactions')
     description = models.CharField(max_length=255)
     amount = models.DecimalField("Valor", max_digits=10, decimal_places=2)
@@ -43,8 +86,14 @@ class Transaction(models.Model):
     # Marca a transação "Pai" como o molde para a recorrência.
     is_recurring = models.BooleanField(default=False)
     
-    # Define a frequência. Começaremos com 'mensal', mas a estrutura permite expandir no futuro.
-    recurrence_interval = models.CharField(max_length=20, choices=[('monthly', 'Mensal')], null=True, blank=True)
+    # Define a frequência (ver transactions/recurrence.py para as regras de cada uma).
+    recurrence_interval = models.CharField(max_length=20, choices=RECURRENCE_CHOICES, null=True, blank=True)
+
+    # Multiplicador da frequência: 'a cada N semanas/meses/anos'.
+    recurrence_every = models.PositiveSmallIntegerField(default=1)
+
+    # Número total de ocorrências (incluindo o molde). Vazio = sem limite.
+    recurrence_count = models.PositiveIntegerField(null=True, blank=True)
     
     # Data final para a criação de novas recorrências.
     recurrence_end_date = models.DateField(null=True, blank=True)
@@ -58,11 +107,21 @@ class Transaction(models.Model):
         blank=True, 
         related_name='recurrences'
     )
+    # Data da última alteração, usada pela sincronização incremental (/api/sync/)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.description} - {self.amount}"
+
+    class Meta:
+        # Índices para a listagem (ordenada por data) e para os filtros mais comuns
+        indexes = [
+            models.Index(fields=['user', 'date'], name='transaction_user_date_idx'),
+            models.Index(fields=['user', 'paid', 'date'], name='transaction_user_paid_idx'),
+            models.Index(fields=['user', 'updated_at'], name='transaction_user_updated_idx'),
+        ]
     
-class BudgetGoal(models.Model):
+class BudgetGoal(SyncedModel):
     GOAL_TYPES = [
         ('spending_limit', 'Limite de Gasto'),
         ('saving_goal', 'Meta de Economia'),
@@ -76,6 +135,180 @@ class BudgetGoal(models.Model):
     category = models.ForeignKey(Category, on_delete=models.CASCADE, null=True, blank=True, limit_choices_to={'type': 'expense'})
     start_date = models.DateField()
     end_date = models.DateField()
+    # Gasto acumulado das metas de limite, ajustado a cada gravação de transação
+    # (None = precisa ser recalculado do zero) e o último alerta já registrado.
+    spent_amount = models.DecimalField("Valor Gasto", max_digits=14, decimal_places=2, null=True, blank=True)
+    alert_level = models.PositiveSmallIntegerField("Último Alerta (%)", default=0)
+    # Data da última alteração, usada pela sincronização incremental (/api/sync/)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.get_goal_type_display()})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'updated_at'], name='goal_user_updated_idx'),
+            # Metas afetadas por uma transação: mesma categoria e janela que contém a data
+            models.Index(fields=['category', 'goal_type', 'end_date'], name='goal_category_window_idx'),
+        ]
+
+class BudgetAlert(models.Model):
+    # Registrado quando o gasto de uma meta de limite cruza 80% ou 100% do valor alvo
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='budget_alerts')
+    goal = models.ForeignKey(BudgetGoal, on_delete=models.CASCADE, related_name='alerts')
+    threshold = models.PositiveSmallIntegerField("Limite (%)")
+    spent_amount = models.DecimalField("Valor Gasto", max_digits=14, decimal_places=2)
+    target_amount = models.DecimalField("Valor Alvo", max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.goal.name}: {self.threshold}%"
+
+    class Meta:
+        indexes = [models.Index(fields=['user', 'created_at'], name='budget_alert_user_created_idx')]
+
+# --- ARQUIVAMENTO DE PERÍODOS FECHADOS ---
+
+class ClosedPeriod(models.Model):
+    # Tudo até 'closed_through' (inclusive) foi consolidado em MonthlySummary
+    # e não pode mais ser alterado.
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='closed_period')
+    closed_through = models.DateField("Fechado até")
+
+    def __str__(self):
+        return f"{self.user} até {self.closed_through}"
+
+class MonthlySummary(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='monthly_summaries')
+    account = models.ForeignKey(Account, on_delete=models.CASCADE)
+    category = models.ForeignKey(Category, on_delete=models.PROTECT)
+    month = models.DateField("Mês")  # Sempre o primeiro dia do mês
+    total = models.DecimalField("Total", max_digits=14, decimal_places=2)
+    count = models.PositiveIntegerField("Quantidade")
+
+    def __str__(self):
+        return f"{self.category} / {self.account} - {self.month:%m/%Y}: {self.total}"
+
+    class Meta:
+        unique_together = ('account', 'category', 'month')
+        indexes = [models.Index(fields=['user', 'month'], name='summary_user_month_idx')]
+
+class ArchivedTransaction(models.Model):
+    # Cópia das transações retiradas da tabela principal (mantém o id original)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_transactions')
+    description = models.CharField(max_length=255)
+    amount = models.DecimalField("Valor", max_digits=10, decimal_places=2)
+    date = models.DateField()
+    category = models.ForeignKey(Category, on_delete=models.PROTECT)
+    account = models.ForeignKey(Account, on_delete=models.CASCADE)
+    paid = models.BooleanField(default=False)
+    parent_transaction_id = models.BigIntegerField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.description} - {self.amount} (arquivada)"
+
+
+# --- FILA DE TAREFAS EM SEGUNDO PLANO ---
+
+class Job(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pendente'),
+        ('running', 'Executando'),
+        ('done', 'Concluída'),
+        ('failed', 'Falhou'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True, related_name='jobs')
+    kind = models.CharField("Tipo", max_length=50)
+    payload = models.JSONField(default=dict)
+    # Evita enfileirar duas vezes a mesma operação (ex.: header Idempotency-Key)
+    idempotency_key = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    run_after = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.get_status_display()})"
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx')]
+
+
+# --- NOTIFICAÇÕES MATERIALIZADAS ---
+
+class NotificationFeed(models.Model):
+    # Uma linha por usuário (a chave primária é o próprio usuário), com as
+    # despesas não pagas que vencem de 'start_date' até 'start_date + days'.
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='notification_feed')
+    start_date = models.DateField()
+    days = models.PositiveSmallIntegerField()
+    items = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return f"{self.name} ({self.get_goal_type_display()})"
\ No newline at end of file
+        return f"Notificações de {self.user} ({len(self.items)})"
+
+
+# --- CÂMBIO ---
+
+class ExchangeRate(models.Model):
+    # Quanto vale 1 unidade de 'currency' na moeda base (settings.BASE_CURRENCY)
+    # na data 'date'. Carregada de arquivo pelo comando load_fx_rates.
+    currency = models.CharField("Moeda", max_length=3, validators=[CURRENCY_VALIDATOR])
+    date = models.DateField()
+    rate = models.DecimalField("Cotação", max_digits=18, decimal_places=8)
+    # Data da última alteração, usada para invalidar os insights em cache
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.currency} {self.date}: {self.rate}"
+
+    class Meta:
+        unique_together = ('currency', 'date')
+
+
+# --- SINCRONIZAÇÃO INCREMENTAL ---
+
+class Tombstone(models.Model):
+    # Registro de exclusão, para os clientes removerem o item do cache local
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='tombstones')
+    model = models.CharField(max_length=30)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id} excluído em {self.deleted_at}"
+
+    class Meta:
+        indexes = [models.Index(fields=['user', 'deleted_at'], name='tombstone_user_deleted_idx')]
+
+
+# Tombstones da exclusão em andamento: lista, False (não registrar) ou None (fora de uma exclusão)
+pending_tombstones = ContextVar('pending_tombstones', default=None)
+
+
+@contextmanager
+def tombstone_batch(using, record=True):
+    """
+    Junta os Tombstones de uma exclusão (o post_delete chega item a item,
+    também para a cascata) e grava todos de uma vez na mesma transação.
+    """
+    if pending_tombstones.get() is not None:
+        # Exclusão disparada dentro de outra: entra no mesmo lote
+        yield
+        return
+    batch = [] if record else False
+    token = pending_tombstones.set(batch)
+    try:
+        with transaction.atomic(using=using, savepoint=False):
+            yield
+            if batch:
+                Tombstone.objects.using(using).bulk_create(batch)
+    finally:
+        pending_tombstones.reset(token)
@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import router, transaction as db_transaction
+from django.utils import timezone
+
+from .models import NotificationFeed, Transaction
+from .serializers import TransactionSerializer
+
+
+def _window(today=None):
+    today = today or timezone.now().date()
+    return today, today + timedelta(days=settings.NOTIFICATION_DAYS)
+
+
+def _is_due(transaction, start_date, end_date):
+    return (
+        not transaction.paid
+        and transaction.category.type == 'expense'
+        and start_date <= transaction.date <= end_date
+    )
+
+
+def _sort_key(item):
+    return item['date'], item['id']
+
+
+def rebuild_feed(user, today=None):
+    """Monta do zero as notificações de contas a vencer do usuário (uma query)."""
+    start_date, end_date = _window(today)
+    # Lê do primário, onde o feed é gravado: get_feed também roda nas views
+    # servidas pela réplica, que pode estar atrasada.
+    due = (
+        Transaction.objects.using(router.db_for_write(Transaction)).filter(user=user, category__type='expense', paid=False, date__range=(start_date, end_date))
+        .select_related('category', 'account').order_by('date', 'id')
+    )
+    feed, _ = NotificationFeed.objects.update_or_create(
+        user=user,
+        defaults={
+            'start_date': start_date,
+            'days': settings.NOTIFICATION_DAYS,
+            'items': TransactionSerializer(due, many=True).data,
+        },
+    )
+    return feed
+
+
+def get_feed(user):
+    """Lê as notificações pela chave primária; remonta se forem de outro dia."""
+    feed = NotificationFeed.objects.filter(pk=user.pk).first()
+    if feed is None or feed.start_date != timezone.now().date() or feed.days != settings.NOTIFICATION_DAYS:
+        feed = rebuild_feed(user)
+    return feed
+
+
+def update_feed(transaction):
+    """Atualiza só a entrada desta transação (criada, paga ou com a data alterada)."""
+    with db_transaction.atomic():
+        feed = NotificationFeed.objects.select_for_update().filter(pk=transaction.user_id).first()
+        if feed is None:
+            return  # Será montado na próxima leitura
+        items = [item for item in feed.items if item['id'] != transaction.pk]
+        if _is_due(transaction, feed.start_date, feed.start_date + timedelta(days=feed.days)):
+            items.append(TransactionSerializer(transaction).data)
+            items.sort(key=_sort_key)
+        if items != feed.items:
+            feed.items = items
+            feed.save(update_fields=['items', 'updated_at'])
+
+
+def remove_from_feed(user_id, transaction_id):
+    with db_transaction.atomic():
+        feed = NotificationFeed.objects.select_for_update().filter(pk=user_id).first()
+        if feed is None:
+            return
+        items = [item for item in feed.items if item['id'] != transaction_id]
+        if len(items) != len(feed.items):
+            feed.items = items
+            feed.save(update_fields=['items', 'updated_at'])
+
+
+def due_on(feed, day):
+    return [item for item in feed.items if item['date'] == day.isoformat()]
@@ -0,0 +1,120 @@
+import calendar
+from datetime import date, timedelta
+
+from dateutil.relativedelta import relativedelta
+
+# Frequências aceitas em Transaction.recurrence_interval.
+# Cada uma vira um passo em dias ou em meses; 'business_day' repete o
+# N-ésimo dia útil do mês (N é tirado da data inicial da série).
+RECURRENCE_CHOICES = [
+    ('daily', 'Diária'),
+    ('weekly', 'Semanal'),
+    ('biweekly', 'Quinzenal'),
+    ('monthly', 'Mensal'),
+    ('yearly', 'Anual'),
+    ('business_day', 'N-ésimo dia útil do mês'),
+]
+
+_STEPS = {
+    'daily': ('days', 1),
+    'weekly': ('days', 7),
+    'biweekly': ('days', 14),
+    'monthly': ('months', 1),
+    'yearly': ('months', 12),
+    'business_day': ('business_day', 1),
+}
+
+
+def business_day_index(day):
+    """Posição de 'day' entre os dias úteis (seg-sex) do seu mês, começando em 1."""
+    first = day.replace(day=1)
+    full_weeks, rest = divmod(day.day, 7)
+    count = full_weeks * 5
+    for offset in range(rest):
+        if (first.weekday() + offset) % 7 < 5:
+            count += 1
+    return max(count, 1)
+
+
+def nth_business_day(year, month, n):
+    """N-ésimo dia útil do mês; se o mês não tiver N dias úteis, o último."""
+    first = date(year, month, 1)
+    # Avança até o primeiro dia útil
+    if first.weekday() >= 5:
+        first += timedelta(days=7 - first.weekday())
+    weeks, rest = divmod(n - 1, 5)
+    result = first + timedelta(weeks=weeks, days=rest)
+    if first.weekday() + rest > 4:
+        result += timedelta(days=2)
+
+    last = date(year, month, calendar.monthrange(year, month)[1])
+    if result > last:
+        result = last - timedelta(days=max(0, last.weekday() - 4))
+    return result
+
+
+class RecurrenceRule:
+    """
+    Regra de recorrência no estilo RRULE: frequência, multiplicador ('a cada N'),
+    limite por quantidade (count, incluindo a primeira ocorrência) e data final.
+
+    A ocorrência de índice k é calculada diretamente a partir da data inicial,
+    então gerar as datas de uma janela qualquer não exige percorrer a série
+    desde o começo. Nas frequências mensais o dia é ancorado na data inicial
+    e ajustado ao fim do mês (31/01 -> 28/02 -> 31/03).
+    """
+
+    def __init__(self, start, interval, every=1, count=None, until=None):
+        if interval not in _STEPS:
+            raise ValueError(f"Frequência de recorrência inválida: {interval!r}")
+        self.start = start
+        self.interval = interval
+        self.unit, base_step = _STEPS[interval]
+        self.step = base_step * max(every or 1, 1)
+        self.count = count
+        self.until = until
+        if self.unit == 'business_day':
+            self.business_day = business_day_index(start)
+
+    @classmethod
+    def for_transaction(cls, transaction, start=None, count=None):
+        return cls(
+            start=start or transaction.date,
+            interval=transaction.recurrence_interval or 'monthly',
+            every=transaction.recurrence_every,
+            count=transaction.recurrence_count if count is None else count,
+            until=transaction.recurrence_end_date,
+        )
+
+    def occurrence(self, index):
+        if index == 0 or self.unit == 'days':
+            return self.start + timedelta(days=index * self.step)
+        if self.unit == 'months':
+            return self.start + relativedelta(months=index * self.step)
+        month = self.start.replace(day=1) + relativedelta(months=index * self.step)
+        return nth_business_day(month.year, month.month, self.business_day)
+
+    def first_index_on_or_after(self, day):
+        if day <= self.start:
+            return 0
+        if self.unit == 'days':
+            return -(-(day - self.start).days // self.step)
+        months = (day.year - self.start.year) * 12 + day.month - self.start.month
+        index = max(months // self.step, 0)
+        while self.occurrence(index) < day:
+            index += 1
+        return index
+
+    def between(self, window_start, window_end):
+        """Datas das ocorrências dentro de [window_start, window_end], em ordem."""
+        if self.until is not None:
+            window_end = min(window_end, self.until)
+        index = self.first_index_on_or_after(window_start)
+        dates = []
+        while self.count is None or index < self.count:
+            current = self.occurrence(index)
+            if current > window_end:
+                break
+            dates.append(current)
+            index += 1
+        return dates
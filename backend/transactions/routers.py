@@ -0,0 +1,87 @@
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Ligado apenas durante as views de leitura pesada (ver ReplicaReadMixin).
+_use_replica = ContextVar('use_replica', default=False)
+
+
+def replica_alias():
+    alias = getattr(settings, 'READ_REPLICA_ALIAS', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+def _pin_key(user_id):
+    return f'replica-pin:{user_id}'
+
+
+def pin_to_primary(user):
+    # Read-your-writes: depois de uma escrita, o usuário lê do primário por
+    # alguns segundos, até a réplica alcançar o que ele acabou de gravar.
+    # Fica no cache padrão, que precisa ser compartilhado entre os workers
+    # (Redis, banco...); o check transactions.E002 recusa o LocMemCache.
+    seconds = getattr(settings, 'READ_REPLICA_STICKY_SECONDS', 5)
+    if seconds > 0:
+        cache.set(_pin_key(user.pk), True, seconds)
+
+
+def is_pinned_to_primary(user):
+    return bool(cache.get(_pin_key(user.pk)))
+
+
+class ReadReplicaRouter:
+    """Envia as leituras das views de análise para a réplica, se configurada."""
+
+    def db_for_read(self, model, **hints):
+        if _use_replica.get():
+            return replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplica e primário têm os mesmos dados, então relações entre eles são válidas.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+class ReplicaReadMixin:
+    """Mixin para APIViews somente leitura que podem ser servidas pela réplica."""
+
+    _replica_token = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if replica_alias() and not is_pinned_to_primary(request.user):
+            self._replica_token = _use_replica.set(True)
+
+    def dispatch(self, request, *args, **kwargs):
+        # O finally cobre também as exceções que o DRF não trata e relança;
+        # sem ele a thread do worker continuaria lendo da réplica.
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            if self._replica_token is not None:
+                _use_replica.reset(self._replica_token)
+                self._replica_token = None
+
+
+class ReplicaStickinessMiddleware:
+    """Marca o usuário para ler do primário logo após qualquer escrita bem-sucedida."""
+
+    WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        user = getattr(request, 'user', None)
+        if (request.method in self.WRITE_METHODS and response.status_code < 400
+                and user is not None and user.is_authenticated and replica_alias()):
+            pin_to_primary(user)
+        return response
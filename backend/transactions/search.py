@@ -0,0 +1,114 @@
+import re
+
+from django.db import connections
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+
+# Índice de busca em Transaction.description, conforme o banco:
+#  - PostgreSQL: índice GIN de trigramas (pg_trgm) sobre UPPER(description),
+#    usado pelo próprio ILIKE do icontains;
+#  - MySQL: índice FULLTEXT com MATCH ... AGAINST em modo booleano;
+#  - SQLite: tabela FTS5 mantida por triggers (substituto local).
+TABLE = 'transactions_transaction'
+FTS_TABLE = 'transactions_transaction_fts'
+TRGM_INDEX = 'transactions_description_trgm'
+FULLTEXT_INDEX = 'transactions_description_ft'
+
+_SQLITE_TRIGGERS = {
+    f'{FTS_TABLE}_ai': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, description) VALUES (new.id, new.description);
+        END""",
+    f'{FTS_TABLE}_ad': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description) VALUES ('delete', old.id, old.description);
+        END""",
+    f'{FTS_TABLE}_au': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF description ON {TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description) VALUES ('delete', old.id, old.description);
+            INSERT INTO {FTS_TABLE}(rowid, description) VALUES (new.id, new.description);
+        END""",
+}
+
+
+def install_search_index(connection):
+    """Cria o índice de busca do banco (idempotente)."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {TRGM_INDEX} ON {TABLE} '
+                f'USING gin ((UPPER(description::text)) gin_trgm_ops)'
+            )
+        elif connection.vendor == 'mysql':
+            cursor.execute(
+                'SELECT COUNT(*) FROM information_schema.statistics '
+                'WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s',
+                [TABLE, FULLTEXT_INDEX],
+            )
+            if not cursor.fetchone()[0]:
+                cursor.execute(f'ALTER TABLE {TABLE} ADD FULLTEXT INDEX {FULLTEXT_INDEX} (description)')
+        elif connection.vendor == 'sqlite':
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"description, content='{TABLE}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+            )
+            # O SQLite recria a tabela (e perde os triggers) quando uma migração
+            # altera suas colunas; nesse caso o índice precisa ser reconstruído.
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s", [TABLE]
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+            missing = [name for name in _SQLITE_TRIGGERS if name not in existing]
+            for name in missing:
+                cursor.execute(_SQLITE_TRIGGERS[name])
+            if missing:
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def repair_search_index(sender, using, **kwargs):
+    # post_migrate: restaura os triggers do FTS5 se uma migração recriou a tabela.
+    connection = connections[using]
+    if connection.vendor != 'sqlite' or FTS_TABLE not in connection.introspection.table_names():
+        return
+    install_search_index(connection)
+
+
+def drop_search_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'DROP INDEX IF EXISTS {TRGM_INDEX}')
+        elif connection.vendor == 'mysql':
+            cursor.execute(f'ALTER TABLE {TABLE} DROP INDEX {FULLTEXT_INDEX}')
+        elif connection.vendor == 'sqlite':
+            for name in _SQLITE_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def search_terms(query):
+    return re.findall(r'\w+', query or '')
+
+
+def search_transactions(queryset, query):
+    """Filtra o queryset pelas palavras de 'query' (todas, por prefixo) na descrição."""
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+
+    vendor = connections[queryset.db].vendor
+    if vendor == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match]
+        ))
+    if vendor == 'mysql':
+        match = ' '.join(f'+{term}*' for term in terms)
+        return queryset.annotate(
+            search_score=RawSQL('MATCH(description) AGAINST (%s IN BOOLEAN MODE)', [match], output_field=FloatField())
+        ).filter(search_score__gt=0)
+
+    # PostgreSQL (índice de trigramas) e demais bancos
+    for term in terms:
+        queryset = queryset.filter(description__icontains=term)
+    return queryset
@@ -1,7 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from django.db.models import Sum
-from .models import Category, Account, Transaction, BudgetGoal
+from .models import Category, Account, Transaction, BudgetGoal, BudgetAlert, Job
+from .archive import Ledger, closed_through
+from .budgets import refresh_goals
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -26,17 +27,44 @@ class AccountSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Account
-        fields = ['id', 'name', 'type', 'balance', 'user']
+        fields = ['id', 'name', 'type', 'currency', 'balance', 'user']
 
     def get_balance(self, obj):
-        income_sum = Transaction.objects.filter(account=obj, category__type='income').aggregate(total=Sum('amount'))['total'] or 0
-        expense_sum = Transaction.objects.filter(account=obj, category__type='expense').aggregate(total=Sum('amount'))['total'] or 0
+        # O mesmo Ledger atende todas as contas da listagem (todas são do mesmo usuário).
+        # O saldo de cada conta fica na moeda da própria conta.
+        if getattr(self, '_ledger', None) is None or self._ledger.user != obj.user_id:
+            self._ledger = Ledger(obj.user_id, base_currency=False)
+        income_sum = self._ledger.sum(account=obj, category__type='income')
+        expense_sum = self._ledger.sum(account=obj, category__type='expense')
         current_balance = obj.balance + income_sum - expense_sum
         return current_balance
 
 # --- 👇 TransactionSerializer ATUALIZADO 👇 ---
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    # Na importação em lote os objetos vêm de um único in_bulk por modelo
+    # (context['preloaded']), em vez de um SELECT por linha.
+    # Só aceita objetos do próprio usuário.
+    def get_queryset(self):
+        return super().get_queryset().filter(user=self.context['request'].user)
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get('preloaded', {}).get(self.get_queryset().model)
+        if preloaded is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            obj = preloaded.get(int(data))
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if obj is None:
+            self.fail('does_not_exist', pk_value=data)
+        return obj
+
 class TransactionSerializer(serializers.ModelSerializer):
     user = serializers.HiddenField(default=serializers.CurrentUserDefault())
+    category = PreloadedPrimaryKeyRelatedField(queryset=Category.objects.all())
+    account = PreloadedPrimaryKeyRelatedField(queryset=Account.objects.all())
     category_name = serializers.CharField(source='category.name', read_only=True)
     account_name = serializers.CharField(source='account.name', read_only=True)
     category_type = serializers.CharField(source='category.type', read_only=True)
@@ -50,6 +78,8 @@ class TransactionSerializer(serializers.ModelSerializer):
             'paid', # Campo para "Já paguei"
             'is_recurring',
             'recurrence_interval',
+            'recurrence_every',
+            'recurrence_count',
             'recurrence_end_date',
             'parent_transaction'
         ]
@@ -57,6 +87,18 @@ class TransactionSerializer(serializers.ModelSerializer):
         # então o tornamos read_only para o frontend.
         read_only_fields = ['parent_transaction']
 
+    def validate(self, attrs):
+        # Períodos fechados (arquivados) não aceitam novas transações nem alterações
+        # Na importação em lote o 'closed_through' vem pronto no context
+        if 'closed_through' in self.context:
+            closed = self.context['closed_through']
+        else:
+            closed = closed_through(self.context['request'].user)
+        dates = [attrs.get('date'), getattr(self.instance, 'date', None)]
+        if closed and any(day and day <= closed for day in dates):
+            raise serializers.ValidationError({'date': 'Esta data pertence a um período já fechado (arquivado).'})
+        return attrs
+
 class BudgetGoalSerializer(serializers.ModelSerializer):
     user = serializers.HiddenField(default=serializers.CurrentUserDefault())
     current_amount = serializers.SerializerMethodField()
@@ -71,17 +113,27 @@ class BudgetGoalSerializer(serializers.ModelSerializer):
         read_only_fields = ['user', 'current_amount']
 
     def get_current_amount(self, obj):
-        if obj.goal_type == 'spending_limit' and obj.category:
-            spent_amount = Transaction.objects.filter(
-                user=obj.user,
-                category=obj.category,
-                date__range=(obj.start_date, obj.end_date)
-            ).aggregate(total=Sum('amount'))['total'] or 0
-            return spent_amount
+        if obj.goal_type == 'spending_limit' and obj.category_id:
+            # Mantido a cada gravação de transação; só é recalculado se foi invalidado
+            if obj.spent_amount is None:
+                refresh_goals([obj])
+            return obj.spent_amount
         return obj.current_amount
 
     def create(self, validated_data):
         if validated_data.get('goal_type') == 'saving_goal':
             initial_current_amount = self.initial_data.get('current_amount', 0.00)
             validated_data['current_amount'] = initial_current_amount
-        return super().create(validated_data)
\ No newline at end of file
+        return super().create(validated_data)
+class BudgetAlertSerializer(serializers.ModelSerializer):
+    goal_name = serializers.CharField(source='goal.name', read_only=True)
+
+    class Meta:
+        model = BudgetAlert
+        fields = ['id', 'goal', 'goal_name', 'threshold', 'spent_amount', 'target_amount', 'created_at']
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = ['id', 'kind', 'status', 'attempts', 'result', 'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
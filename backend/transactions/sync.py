@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from .models import Account, BudgetGoal, Category, Tombstone, Transaction, pending_tombstones
+from .serializers import AccountSerializer, BudgetGoalSerializer, CategorySerializer, TransactionSerializer
+
+# Coleções sincronizadas: nome na resposta -> (modelo, serializer)
+COLLECTIONS = {
+    'categories': (Category, CategorySerializer),
+    'accounts': (Account, AccountSerializer),
+    'transactions': (Transaction, TransactionSerializer),
+    'goals': (BudgetGoal, BudgetGoalSerializer),
+}
+_NAMES = {model: name for name, (model, _) in COLLECTIONS.items()}
+
+
+def record_tombstone(sender, instance, origin=None, **kwargs):
+    # post_delete: também dispara para os itens apagados em cascata.
+    # Quando o próprio usuário é excluído não há cliente para avisar.
+    if isinstance(origin, User) or (isinstance(origin, QuerySet) and origin.model is User):
+        return
+    batch = pending_tombstones.get()
+    if batch is False:
+        return
+    tombstone = Tombstone(user_id=instance.user_id, model=_NAMES[sender], object_id=instance.pk)
+    if batch is None:
+        tombstone.save()  # Exclusão fora de SyncedModel/SyncedQuerySet (ex.: Collector direto)
+    else:
+        batch.append(tombstone)
+
+
+def touch_accounts(account_ids):
+    # O saldo enviado na sincronização é derivado das transações: as contas
+    # afetadas voltam a aparecer como alteradas para os clientes.
+    Account.objects.filter(pk__in=set(account_ids)).update(updated_at=timezone.now())
+
+
+def connect_signals():
+    from django.db.models.signals import post_delete
+    for model in _NAMES:
+        post_delete.connect(record_tombstone, sender=model, dispatch_uid=f'tombstone-{model.__name__}')
+
+
+def changes_since(request, since):
+    """
+    Itens criados/alterados e ids excluídos desde 'since' (None = carga completa).
+    O cursor devolvido volta alguns segundos para não perder gravações que
+    estavam em andamento; o cliente deve aplicar os itens por id (upsert).
+    """
+    now = timezone.now()
+    retention = now - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+    full = since is None or since < retention
+    user = request.user
+    context = {'request': request}
+
+    data = {'full': full, 'cursor': now - timedelta(seconds=settings.SYNC_CURSOR_OVERLAP_SECONDS)}
+    deleted = {}
+    if not full:
+        for model_name, object_id in Tombstone.objects.filter(user=user, deleted_at__gte=since).values_list('model', 'object_id'):
+            deleted.setdefault(model_name, set()).add(object_id)
+
+    for name, (model, serializer_class) in COLLECTIONS.items():
+        queryset = model.objects.filter(user=user)
+        if name == 'transactions':
+            queryset = queryset.select_related('category', 'account')
+        if not full:
+            queryset = queryset.filter(updated_at__gte=since)
+        data[name] = {
+            'updated': serializer_class(queryset.order_by('updated_at', 'id'), many=True, context=context).data,
+            'deleted': sorted(deleted.get(name, ())),
+        }
+    return data
+
+
+def prune_tombstones():
+    limit = timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=limit).delete()
+    return deleted
@@ -0,0 +1,122 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from dateutil.relativedelta import relativedelta
+from django.contrib.auth.models import User
+from django.db import transaction as db_transaction
+
+from .archive import archive_user, closed_through
+from .budgets import apply_changes, entries
+from .jobs import task
+from .models import Account, Category, Transaction
+from .notifications import rebuild_feed
+from .recurrence import RecurrenceRule
+from .sync import touch_accounts
+
+
+def create_recurrences(template, root_parent, rule):
+    # Define um limite de 2 anos se o usuário não especificar uma data final
+    limit_date = rule.until or (rule.start + relativedelta(years=2))
+    dates = rule.between(rule.start + timedelta(days=1), limit_date)
+    return Transaction.objects.bulk_create([
+        Transaction(
+            user=template.user,
+            category=template.category,
+            account=template.account,
+            description=template.description,
+            amount=template.amount,
+            date=current_date,
+            paid=False,
+            is_recurring=False,
+            parent_transaction=root_parent # Linka a "filha" com o "pai"
+        )
+        for current_date in dates
+    ])
+
+
+@task('regenerate_series')
+def regenerate_series(root_id, template_id):
+    """Recria as filhas futuras da série usando a transação 'template_id' como novo molde."""
+    root_parent = Transaction.objects.filter(pk=root_id).first()
+    template = Transaction.objects.select_related('user', 'category', 'account').filter(pk=template_id).first()
+    if root_parent is None or template is None:
+        return {'created': 0, 'deleted': 0}
+
+    with db_transaction.atomic():
+        future = root_parent.recurrences.filter(date__gt=template.date)
+        doomed = list(future.select_related('account'))
+        removed = entries(doomed)
+        deleted, _ = future.delete()
+
+        # Quantas ocorrências ainda restam, se a série tiver limite de quantidade
+        remaining = None
+        if root_parent.recurrence_count:
+            already_done = root_parent.recurrences.filter(date__lte=template.date).count()
+            remaining = max(root_parent.recurrence_count - already_done, 0)
+
+        rule = RecurrenceRule.for_transaction(root_parent, start=template.date, count=remaining)
+        created = create_recurrences(template, root_parent, rule)
+        apply_changes(template.user, added=entries(created), removed=removed)
+        touch_accounts([template.account_id, *(row.account_id for row in doomed)])
+    rebuild_feed(template.user)
+    return {'created': len(created), 'deleted': deleted}
+
+
+def _referenced_ids(rows, field):
+    ids = set()
+    for row in rows:
+        try:
+            ids.add(int(row.get(field)))
+        except (AttributeError, TypeError, ValueError):
+            pass  # O serializer aponta o erro da linha
+    return ids
+
+
+@task('import_transactions')
+def import_transactions(user_id, rows):
+    """Valida e grava uma lista de transações; retorna os erros por linha."""
+    from .serializers import TransactionSerializer
+
+    user = User.objects.get(pk=user_id)
+    # O que a validação consulta no banco é carregado uma vez para o lote inteiro
+    context = {
+        'request': SimpleNamespace(user=user),
+        'closed_through': closed_through(user),
+        'preloaded': {
+            Category: Category.objects.filter(user=user).in_bulk(_referenced_ids(rows, 'category')),
+            Account: Account.objects.filter(user=user).in_bulk(_referenced_ids(rows, 'account')),
+        },
+    }
+    valid, errors = [], {}
+    for index, row in enumerate(rows):
+        serializer = TransactionSerializer(data=row, context=context)
+        if serializer.is_valid():
+            valid.append(serializer.validated_data)
+        else:
+            errors[index] = serializer.errors
+
+    with db_transaction.atomic():
+        # Linhas simples vão num único INSERT; moldes de recorrência precisam do id
+        # para ligar as filhas, então são gravados um a um.
+        simple = [Transaction(**data) for data in valid if not data.get('is_recurring')]
+        created = Transaction.objects.bulk_create(simple, batch_size=1000)
+        recurring = 0
+        for data in valid:
+            if data.get('is_recurring'):
+                parent = Transaction.objects.create(**data)
+                created.append(parent)
+                if parent.recurrence_interval:
+                    recurrences = create_recurrences(parent, parent, RecurrenceRule.for_transaction(parent))
+                    created += recurrences
+                    recurring += len(recurrences)
+        # Metas de limite: uma única avaliação para o lote inteiro
+        alerts = apply_changes(user, added=entries(created))
+        touch_accounts(row.account_id for row in created)
+    rebuild_feed(user)
+    return {'imported': len(valid), 'recurrences': recurring, 'budget_alerts': len(alerts), 'errors': errors}
+
+
+@task('archive_user')
+def archive_user_task(user_id, cutoff, move=False):
+    created, moved = archive_user(User.objects.get(pk=user_id), date.fromisoformat(cutoff), move=move)
+    return {'summaries': created, 'moved': moved}
@@ -0,0 +1,78 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db.models.functions import TruncMonth
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from transactions.archive import Ledger, archive_user
+from transactions.models import Account, ArchivedTransaction, Category, Transaction
+from transactions.recurrence import RecurrenceRule
+from transactions.tasks import create_recurrences
+
+CUTOFF = date(2024, 12, 31)
+
+
+class ArchiveKeepsTotalsTests(TestCase):
+    """Fechar e mover o histórico não pode mudar nenhum número mostrado ao usuário."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('arquivo', password='senha-teste')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        checking = Account.objects.create(user=self.user, name='Corrente', balance=Decimal('1000'))
+        card = Account.objects.create(user=self.user, name='Cartão')
+        salary = Category.objects.create(user=self.user, name='Salário', type='income')
+        food = Category.objects.create(user=self.user, name='Mercado', type='expense')
+        rent = Category.objects.create(user=self.user, name='Aluguel', type='expense')
+
+        rows = []
+        day = date(2024, 1, 3)
+        while day <= timezone.now().date():
+            rows.append(Transaction(user=self.user, account=checking, category=salary, description='Salário',
+                                    amount=Decimal('3000'), date=day, paid=True))
+            for offset, amount in ((2, '120.50'), (9, '89.90'), (20, '230.00')):
+                rows.append(Transaction(user=self.user, account=card if offset == 9 else checking, category=food,
+                                        description='Mercado', amount=Decimal(amount), date=day + timedelta(days=offset), paid=True))
+            day = (day.replace(day=1) + timedelta(days=32)).replace(day=3)
+        Transaction.objects.bulk_create(rows)
+        # Série que atravessa o corte: o molde fica na tabela principal
+        rent_series = Transaction.objects.create(
+            user=self.user, account=checking, category=rent, description='Aluguel', amount=Decimal('1500'),
+            date=date(2024, 10, 10), is_recurring=True, recurrence_interval='monthly',
+        )
+        create_recurrences(rent_series, rent_series, RecurrenceRule.for_transaction(rent_series))
+
+    def snapshot(self):
+        ledger = Ledger(self.user)
+        return {
+            'sum': ledger.sum(),
+            'count': ledger.count(),
+            'by_category': ledger.sum_by('category__name'),
+            'monthly': sorted(
+                (row['category_id'], row['month'], row['total']) for row in ledger.monthly_by(['category_id'])
+            ),
+            'by_period': ledger.sum_by_period(TruncMonth),
+            'dashboard': self.client.get('/api/dashboard/').data['summary'],
+            'analytics': self.client.get('/api/analytics/', {'period': 'this_year'}).data,
+            'balances': [(row['name'], row['balance']) for row in self.client.get('/api/accounts/').data['results']],
+            'forecast': self.client.get('/api/forecast/').data['total'],
+        }
+
+    def test_archive_and_move_keep_every_total(self):
+        before = self.snapshot()
+        summaries, moved = archive_user(self.user, CUTOFF, move=True)
+        self.assertGreater(summaries, 0)
+        self.assertGreater(moved, 0)
+        self.assertFalse(Transaction.objects.filter(user=self.user, date__lte=CUTOFF, is_recurring=False).exists())
+        self.assertTrue(Transaction.objects.filter(user=self.user, is_recurring=True).exists())
+        self.assertEqual(self.snapshot(), before)
+
+    def test_move_after_the_period_was_already_closed(self):
+        before = self.snapshot()
+        self.assertEqual(archive_user(self.user, CUTOFF)[1], 0)
+        self.assertEqual(archive_user(self.user, CUTOFF, move=True)[0], 0)
+        self.assertGreater(ArchivedTransaction.objects.filter(user=self.user).count(), 0)
+        self.assertEqual(self.snapshot(), before)
@@ -0,0 +1,97 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from transactions.archive import Ledger
+from transactions.budgets import apply_changes, invalidate_goals
+from transactions.models import Account, BudgetAlert, BudgetGoal, Category, Transaction
+
+JANUARY = (date(2025, 1, 1), date(2025, 1, 31))
+
+
+class ApplyChangesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('metas', password='senha-teste')
+        self.account = Account.objects.create(user=self.user, name='Conta')
+        self.food = Category.objects.create(user=self.user, name='Mercado', type='expense')
+        self.fun = Category.objects.create(user=self.user, name='Lazer', type='expense')
+        self.goal = BudgetGoal.objects.create(
+            user=self.user, name='Mercado', goal_type='spending_limit', category=self.food,
+            target_amount=Decimal('100'), start_date=JANUARY[0], end_date=JANUARY[1], spent_amount=Decimal('0'),
+        )
+
+    def apply(self, added=(), removed=()):
+        alerts = apply_changes(self.user, added=added, removed=removed)
+        self.goal.refresh_from_db()
+        return [alert.threshold for alert in alerts]
+
+    def test_deltas_only_count_the_goal_category_and_window(self):
+        self.apply(added=[
+            (self.food.pk, date(2025, 1, 10), Decimal('30')),
+            (self.food.pk, date(2025, 2, 1), Decimal('500')),
+            (self.fun.pk, date(2025, 1, 10), Decimal('500')),
+        ])
+        self.assertEqual(self.goal.spent_amount, Decimal('30.00'))
+        self.apply(added=[(self.food.pk, date(2025, 1, 12), Decimal('15'))], removed=[(self.food.pk, date(2025, 1, 10), Decimal('30'))])
+        self.assertEqual(self.goal.spent_amount, Decimal('15.00'))
+
+    def test_alerts_fire_once_per_threshold_and_rearm_below_it(self):
+        self.assertEqual(self.apply(added=[(self.food.pk, date(2025, 1, 5), Decimal('50'))]), [])
+        self.assertEqual(self.apply(added=[(self.food.pk, date(2025, 1, 6), Decimal('35'))]), [80])
+        self.assertEqual(self.apply(added=[(self.food.pk, date(2025, 1, 7), Decimal('1'))]), [])
+        self.assertEqual(self.apply(added=[(self.food.pk, date(2025, 1, 8), Decimal('20'))]), [100])
+        self.assertEqual(self.goal.alert_level, 100)
+        # Voltou abaixo de 80%: os dois limites podem alertar de novo
+        self.apply(removed=[(self.food.pk, date(2025, 1, 8), Decimal('40'))])
+        self.assertEqual((self.goal.spent_amount, self.goal.alert_level), (Decimal('66.00'), 0))
+        self.assertEqual(self.apply(added=[(self.food.pk, date(2025, 1, 9), Decimal('40'))]), [80, 100])
+        self.assertEqual(BudgetAlert.objects.filter(goal=self.goal).count(), 4)
+
+    def test_invalidated_goal_is_recalculated_from_the_ledger(self):
+        Transaction.objects.create(user=self.user, account=self.account, category=self.food, description='x',
+                                   amount=Decimal('70'), date=date(2025, 1, 3))
+        invalidate_goals(self.user)
+        self.goal.refresh_from_db()
+        self.assertIsNone(self.goal.spent_amount)
+        # A meta recalculada já inclui a transação nova: não soma de novo o delta
+        Transaction.objects.create(user=self.user, account=self.account, category=self.food, description='y',
+                                   amount=Decimal('15'), date=date(2025, 1, 4))
+        self.assertEqual(self.apply(added=[(self.food.pk, date(2025, 1, 4), Decimal('15'))]), [80])
+        self.assertEqual(self.goal.spent_amount, Decimal('85.00'))
+
+    def test_writes_bump_updated_at(self):
+        before = self.goal.updated_at
+        self.apply(added=[(self.food.pk, date(2025, 1, 5), Decimal('1'))])
+        self.assertGreater(self.goal.updated_at, before)
+        before = self.goal.updated_at
+        invalidate_goals(self.user)
+        self.goal.refresh_from_db()
+        self.assertGreater(self.goal.updated_at, before)
+
+
+class GoalSpentThroughTheApiTests(TestCase):
+    def test_spent_amount_follows_transaction_writes(self):
+        user = User.objects.create_user('api-metas', password='senha-teste')
+        client = APIClient()
+        client.force_authenticate(user)
+        account = Account.objects.create(user=user, name='Conta')
+        category = Category.objects.create(user=user, name='Mercado', type='expense')
+        goal = BudgetGoal.objects.create(
+            user=user, name='Mercado', goal_type='spending_limit', category=category,
+            target_amount=Decimal('100'), start_date=JANUARY[0], end_date=JANUARY[1], spent_amount=Decimal('0'),
+        )
+        payload = {'description': 'x', 'category': category.pk, 'account': account.pk}
+        first = client.post('/api/transactions/', {**payload, 'amount': '40', 'date': '2025-01-05'}, format='json').data['id']
+        client.post('/api/transactions/', {**payload, 'amount': '25', 'date': '2025-01-20'}, format='json')
+        client.patch(f'/api/transactions/{first}/', {'amount': '60'}, format='json')
+        second = client.post('/api/transactions/', {**payload, 'amount': '5', 'date': '2025-01-25'}, format='json').data['id']
+        client.delete(f'/api/transactions/{second}/')
+
+        goal.refresh_from_db()
+        expected = Ledger(user).sum(category_id=category.pk, date__range=JANUARY)
+        self.assertEqual(goal.spent_amount, expected)
+        self.assertEqual(goal.spent_amount, Decimal('85.00'))
+        self.assertEqual(list(goal.alerts.values_list('threshold', flat=True)), [80])
@@ -0,0 +1,112 @@
+import calendar
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+
+from transactions.models import Account, Category, Transaction
+from transactions.recurrence import RecurrenceRule, business_day_index, nth_business_day
+from transactions.tasks import create_recurrences, regenerate_series
+
+
+def business_days(year, month):
+    days = (date(year, month, day) for day in range(1, calendar.monthrange(year, month)[1] + 1))
+    return [day for day in days if day.weekday() < 5]
+
+
+class BusinessDayTests(SimpleTestCase):
+    def test_nth_business_day_matches_brute_force(self):
+        for year in (2023, 2024, 2025):
+            for month in range(1, 13):
+                expected = business_days(year, month)
+                for n in range(1, 26):
+                    # Meses com menos de N dias úteis ficam no último
+                    self.assertEqual(nth_business_day(year, month, n), expected[min(n, len(expected)) - 1], (year, month, n))
+
+    def test_business_day_index_matches_brute_force(self):
+        for year in (2023, 2024, 2025):
+            for month in range(1, 13):
+                for position, day in enumerate(business_days(year, month), start=1):
+                    self.assertEqual(business_day_index(day), position, day)
+
+
+class RecurrenceRuleTests(SimpleTestCase):
+    def test_monthly_clamps_to_month_end_and_keeps_anchor(self):
+        rule = RecurrenceRule(date(2024, 1, 31), 'monthly')
+        self.assertEqual(
+            rule.between(date(2024, 1, 1), date(2024, 5, 31)),
+            [date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 31), date(2024, 4, 30), date(2024, 5, 31)],
+        )
+
+    def test_yearly_from_leap_day(self):
+        rule = RecurrenceRule(date(2024, 2, 29), 'yearly')
+        self.assertEqual(
+            rule.between(date(2024, 1, 1), date(2028, 12, 31)),
+            [date(2024, 2, 29), date(2025, 2, 28), date(2026, 2, 28), date(2027, 2, 28), date(2028, 2, 29)],
+        )
+
+    def test_business_day_series_keeps_position(self):
+        # 03/01/2024 é o 3º dia útil de janeiro
+        rule = RecurrenceRule(date(2024, 1, 3), 'business_day')
+        self.assertEqual(
+            rule.between(date(2024, 1, 1), date(2024, 4, 30)),
+            [date(2024, 1, 3), date(2024, 2, 5), date(2024, 3, 5), date(2024, 4, 3)],
+        )
+
+    def test_count_and_until_limit_the_series(self):
+        rule = RecurrenceRule(date(2024, 1, 1), 'weekly', count=3)
+        self.assertEqual(rule.between(date(2024, 1, 1), date(2024, 12, 31)), [date(2024, 1, 1), date(2024, 1, 8), date(2024, 1, 15)])
+        rule = RecurrenceRule(date(2024, 1, 1), 'biweekly', until=date(2024, 2, 11))
+        self.assertEqual(rule.between(date(2024, 1, 2), date(2024, 12, 31)), [date(2024, 1, 15), date(2024, 1, 29)])
+
+    def test_first_index_on_or_after_matches_brute_force(self):
+        rules = [
+            RecurrenceRule(date(2024, 1, 31), 'monthly'),
+            RecurrenceRule(date(2024, 1, 31), 'monthly', every=3),
+            RecurrenceRule(date(2024, 2, 29), 'yearly'),
+            RecurrenceRule(date(2024, 1, 10), 'biweekly', every=2),
+            RecurrenceRule(date(2024, 1, 22), 'business_day'),
+            RecurrenceRule(date(2024, 3, 29), 'business_day', every=2),
+        ]
+        for rule in rules:
+            for offset in range(0, 800, 3):
+                day = date(2023, 12, 1) + timedelta(days=offset)
+                index = 0
+                while rule.occurrence(index) < day:
+                    index += 1
+                self.assertEqual(rule.first_index_on_or_after(day), index, (rule.interval, rule.start, day))
+
+    def test_window_in_the_middle_of_the_series(self):
+        rule = RecurrenceRule(date(2024, 1, 31), 'monthly')
+        self.assertEqual(rule.between(date(2025, 2, 1), date(2025, 3, 31)), [date(2025, 2, 28), date(2025, 3, 31)])
+
+
+class RegenerateSeriesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('serie', password='senha-teste')
+        self.account = Account.objects.create(user=self.user, name='Conta')
+        self.category = Category.objects.create(user=self.user, name='Aluguel', type='expense')
+
+    def test_count_is_kept_when_the_series_is_regenerated(self):
+        root = Transaction.objects.create(
+            user=self.user, account=self.account, category=self.category, description='Aluguel',
+            amount=Decimal('100'), date=date(2024, 1, 31), is_recurring=True,
+            recurrence_interval='monthly', recurrence_count=5,
+        )
+        create_recurrences(root, root, RecurrenceRule.for_transaction(root))
+        template = root.recurrences.get(date=date(2024, 3, 31))
+        template.amount = Decimal('120')
+        template.save()
+
+        regenerate_series(root.pk, template.pk)
+
+        series = Transaction.objects.filter(user=self.user).order_by('date')
+        self.assertEqual(
+            [(row.date, row.amount) for row in series],
+            [
+                (date(2024, 1, 31), Decimal('100')), (date(2024, 2, 29), Decimal('100')),
+                (date(2024, 3, 31), Decimal('120')), (date(2024, 4, 30), Decimal('120')),
+                (date(2024, 5, 31), Decimal('120')),
+            ],
+        )
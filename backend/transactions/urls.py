@@ -14,10 +14,15 @@ urlpatterns = [
     path('accounts/', views.AccountListCreate.as_view(), name='account-list-create'),
     path('accounts/<int:pk>/', views.AccountDetail.as_view(), name='account-detail'),
     path('transactions/', views.TransactionListCreate.as_view(), name='transaction-list-create'),
+    path('transactions/import/', views.TransactionImportView.as_view(), name='transaction-import'),
+    path('transactions/search/', views.TransactionSearchView.as_view(), name='transaction-search'),
     path('transactions/<int:pk>/', views.TransactionDetail.as_view(), name='transaction-detail'),
 
     # Rota da Home Page (resumo rápido)
     path('dashboard/', views.DashboardData.as_view(), name='dashboard-data'),
+    path('sync/', views.SyncView.as_view(), name='sync'),
+    path('notifications/', views.NotificationFeedView.as_view(), name='notification-feed'),
+    path('forecast/', views.CashFlowForecastView.as_view(), name='cash-flow-forecast'),
     
     # Rotas do Usuário
     path('user/profile/', views.UserProfileView.as_view(), name='user-profile'),
@@ -25,10 +30,14 @@ urlpatterns = [
 
     # Rotas para o Dashboard de Análise
     path('analytics/', views.AnalyticsView.as_view(), name='analytics-data'),
+    path('analytics/insights/', views.InsightsView.as_view(), name='analytics-insights'),
     path('reports/category-summary/', views.CategorySummaryReport.as_view(), name='category-summary-report'),
     path('categories/user-list/', views.UserCategoryListView.as_view(), name='user-category-list'),
     path('analytics/category-details/', views.CategoryDetailsAnalyticsView.as_view(), name='analytics-category-details'),
     
+    # Acompanhamento das tarefas em segundo plano
+    path('jobs/<int:pk>/', views.JobStatusView.as_view(), name='job-status'),
+
     # Rotas para Metas
     path('budget-goals/', views.BudgetGoalView.as_view(), name='goal-list-create'),
     path('budget-goals/<int:pk>/', views.BudgetGoalDetailView.as_view(), name='goal-detail'),
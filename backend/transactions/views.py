@@ -2,16 +2,30 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, generics, serializers
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from django.conf import settings
 from django.shortcuts import get_object_or_404
-from django.db.models import Sum
+from django.db.models import Count, F, Sum
 from django.db.models.functions import TruncMonth, TruncWeek
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from dateutil.relativedelta import relativedelta
 from decimal import Decimal, InvalidOperation
 from datetime import date, timedelta
 
-from .models import Category, Account, Transaction, BudgetGoal
-from .serializers import CategorySerializer, AccountSerializer, TransactionSerializer, UserSerializer, BudgetGoalSerializer
+from .models import Category, Account, Transaction, BudgetGoal, BudgetAlert, MonthlySummary, Job
+from .serializers import CategorySerializer, AccountSerializer, TransactionSerializer, UserSerializer, BudgetGoalSerializer, BudgetAlertSerializer, JobSerializer
+from .routers import ReplicaReadMixin
+from .recurrence import RecurrenceRule
+from .forecast import build_forecast
+from .filters import filter_transactions
+from .search import search_transactions
+from .archive import Ledger, is_closed
+from .jobs import enqueue
+from .tasks import create_recurrences
+from .fx import converted, has_foreign_accounts
+from .sync import changes_since, touch_accounts
+from .notifications import due_on, get_feed, rebuild_feed, remove_from_feed, update_feed
+from .budgets import apply_changes, entries, invalidate_goals, refresh_goals
 
 # --- Views de Autenticação e Usuário ---
 
@@ -58,7 +72,7 @@ class CategoryDetail(generics.RetrieveUpdateDestroyAPIView):
         return Category.objects.filter(user=self.request.user)
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
-        if Transaction.objects.filter(category=instance).exists():
+        if Transaction.objects.filter(category=instance).exists() or MonthlySummary.objects.filter(category=instance).exists():
             return Response({"error": "Não é possível excluir uma categoria que já está em uso."}, status=status.HTTP_400_BAD_REQUEST)
         self.perform_destroy(instance)
         return Response(status=status.HTTP_204_NO_CONTENT)
@@ -74,39 +88,67 @@ class AccountDetail(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
     def get_queryset(self):
         return Account.objects.filter(user=self.request.user)
+    def perform_update(self, serializer):
+        old_currency = serializer.instance.currency
+        account = serializer.save()
+        # Os gastos das metas são somados na moeda base
+        if account.currency != old_currency:
+            invalidate_goals(self.request.user)
+    def perform_destroy(self, instance):
+        instance.delete()
+        rebuild_feed(self.request.user)
+        invalidate_goals(self.request.user)
 
 # --- [ATUALIZADO] View para CRIAR transações (com lógica de recorrência) ---
 class TransactionListCreate(generics.ListCreateAPIView):
     serializer_class = TransactionSerializer
     permission_classes = [IsAuthenticated]
     def get_queryset(self):
-        return Transaction.objects.filter(user=self.request.user).order_by('-date')
+        queryset = Transaction.objects.filter(user=self.request.user).select_related('category', 'account')
+        return filter_transactions(queryset, self.request.query_params).order_by('-date', '-id')
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        # Rodapé com os totais do filtro inteiro (não só da página), numa única query agrupada
+        queryset = self.filter_queryset(self.get_queryset())
+        # Com contas em outras moedas, os totais são convertidos para a moeda base
+        amount = converted('amount', 'account__currency', 'date') if has_foreign_accounts(request.user) else F('amount')
+        totals = {'count': 0, 'income': 0, 'expenses': 0}
+        for row in queryset.order_by().values('category__type').annotate(count=Count('id'), total=Sum(amount)):
+            totals['count'] += row['count']
+            if row['category__type'] == 'income':
+                totals['income'] = row['total']
+            elif row['category__type'] == 'expense':
+                totals['expenses'] = row['total']
+        totals['net'] = totals['income'] - totals['expenses']
+        response.data['totals'] = totals
+        return response
     
     def perform_create(self, serializer):
         # 1. Salva a transação "pai" (o molde) que o usuário enviou
         transaction = serializer.save(user=self.request.user)
 
-        # 2. Verifica se é uma nova recorrência
-        if transaction.is_recurring and transaction.recurrence_interval == 'monthly':
-            # Define um limite de 2 anos se o usuário não especificar uma data final
-            limit_date = transaction.recurrence_end_date or (transaction.date + relativedelta(years=2))
-            
-            current_date = transaction.date + relativedelta(months=1)
-
-            # 3. Cria as transações "filhas" para os próximos meses
-            while current_date <= limit_date:
-                Transaction.objects.create(
-                    user=transaction.user,
-                    category=transaction.category,
-                    account=transaction.account,
-                    description=transaction.description,
-                    amount=transaction.amount,
-                    date=current_date,
-                    paid=False,
-                    is_recurring=False,
-                    parent_transaction=transaction # Linka a "filha" com o "pai"
-                )
-                current_date += relativedelta(months=1)
+        # 2. Verifica se é uma nova recorrência e cria as transações "filhas"
+        recurrences = []
+        if transaction.is_recurring and transaction.recurrence_interval:
+            rule = RecurrenceRule.for_transaction(transaction)
+            recurrences = create_recurrences(transaction, transaction, rule)
+            rebuild_feed(transaction.user)
+        else:
+            update_feed(transaction)
+        apply_changes(transaction.user, added=entries([transaction, *recurrences]))
+        touch_accounts([transaction.account_id])
+
+class TransactionSearchView(ReplicaReadMixin, generics.ListAPIView):
+    serializer_class = TransactionSerializer
+    permission_classes = [IsAuthenticated]
+    def get_queryset(self):
+        query = self.request.query_params.get('q', '')
+        if not query.strip():
+            raise serializers.ValidationError({'q': 'Informe o termo de busca.'})
+        queryset = Transaction.objects.filter(user=self.request.user).select_related('category', 'account')
+        queryset = filter_transactions(queryset, self.request.query_params)
+        return search_transactions(queryset, query).order_by('-date', '-id')
 
 # --- [ATUALIZADO] View para EDITAR/DELETAR transações (com lógica de recorrência) ---
 class TransactionDetail(generics.RetrieveUpdateDestroyAPIView):
@@ -120,7 +162,12 @@ class TransactionDetail(generics.RetrieveUpdateDestroyAPIView):
         apply_to_future = self.request.data.get('apply_to_future', False)
         
         # Salva a instância atual com os novos dados
+        before = entries([serializer.instance])
+        previous_account_id = serializer.instance.account_id
         updated_transaction = serializer.save()
+        update_feed(updated_transaction)
+        apply_changes(updated_transaction.user, added=entries([updated_transaction]), removed=before)
+        touch_accounts([previous_account_id, updated_transaction.account_id])
 
         # Se a flag for verdadeira e a transação for parte de uma série recorrente...
         if apply_to_future and (updated_transaction.parent_transaction or updated_transaction.is_recurring):
@@ -128,26 +175,61 @@ class TransactionDetail(generics.RetrieveUpdateDestroyAPIView):
             # Encontra a transação "pai" original da série
             root_parent = updated_transaction if updated_transaction.is_recurring else updated_transaction.parent_transaction
             
-            # Se encontrou um pai, apaga todas as transações futuras da série
+            # Se encontrou um pai, a série é refeita em segundo plano (apaga as
+            # futuras e recria a partir da transação atualizada, o novo molde)
             if root_parent:
-                root_parent.recurrences.filter(date__gt=updated_transaction.date).delete()
-
-                # Recria as transações futuras usando a transação atualizada como novo molde
-                limit_date = root_parent.recurrence_end_date or (updated_transaction.date + relativedelta(years=2))
-                current_date = updated_transaction.date + relativedelta(months=1)
-
-                while current_date <= limit_date:
-                    Transaction.objects.create(
-                        user=updated_transaction.user,
-                        category=updated_transaction.category,
-                        account=updated_transaction.account,
-                        description=updated_transaction.description,
-                        amount=updated_transaction.amount, # <-- Usa o novo valor
-                        date=current_date,
-                        is_recurring=False,
-                        parent_transaction=root_parent
-                    )
-                    current_date += relativedelta(months=1)
+                self.job = enqueue(
+                    'regenerate_series',
+                    {'root_id': root_parent.pk, 'template_id': updated_transaction.pk},
+                    user=self.request.user,
+                    key=idempotency_key(self.request),
+                )
+
+    def update(self, request, *args, **kwargs):
+        self.job = None
+        response = super().update(request, *args, **kwargs)
+        if self.job is not None:
+            response.data['job'] = JobSerializer(self.job).data
+        return response
+
+    def perform_destroy(self, instance):
+        if is_closed(instance.user, instance.date):
+            raise serializers.ValidationError({'date': 'Esta transação pertence a um período já fechado (arquivado).'})
+        has_recurrences = instance.is_recurring
+        transaction_id = instance.pk
+        # Apagar o molde apaga as filhas junto (CASCADE)
+        doomed = [instance, *instance.recurrences.select_related('account')] if has_recurrences else [instance]
+        removed = entries(doomed)
+        instance.delete()
+        if has_recurrences:
+            rebuild_feed(self.request.user)
+        else:
+            remove_from_feed(self.request.user.pk, transaction_id)
+        apply_changes(self.request.user, removed=removed)
+        touch_accounts(row.account_id for row in doomed)
+
+class TransactionImportView(APIView):
+    permission_classes = [IsAuthenticated]
+    def post(self, request):
+        rows = request.data.get('transactions')
+        if not isinstance(rows, list) or not rows:
+            return Response({"error": "Envie uma lista não vazia em 'transactions'."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > settings.IMPORT_MAX_ROWS:
+            return Response({"error": f"Limite de {settings.IMPORT_MAX_ROWS} transações por importação."}, status=status.HTTP_400_BAD_REQUEST)
+        job = enqueue('import_transactions', {'user_id': request.user.pk, 'rows': rows}, user=request.user, key=idempotency_key(request))
+        return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+# --- FILA DE TAREFAS ---
+
+def idempotency_key(request):
+    key = request.headers.get('Idempotency-Key')
+    return f"{request.user.pk}:{key}" if key else None
+
+class JobStatusView(generics.RetrieveAPIView):
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+    def get_queryset(self):
+        return Job.objects.filter(user=self.request.user)
 
 # --- VIEWS PARA METAS ---
 
@@ -160,13 +242,16 @@ class BudgetGoalView(generics.ListCreateAPIView):
     def perform_create(self, serializer):
         if self.request.data.get('goal_type') == 'spending_limit' and not self.request.data.get('category'):
             raise serializers.ValidationError({'category': 'Metas de limite de gasto devem estar associadas a uma categoria.'})
-        serializer.save(user=self.request.user)
+        refresh_goals([serializer.save(user=self.request.user)])
 
 class BudgetGoalDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = BudgetGoalSerializer
     permission_classes = [IsAuthenticated]
     def get_queryset(self):
         return BudgetGoal.objects.filter(user=self.request.user)
+    def perform_update(self, serializer):
+        # Categoria, período ou valor alvo podem ter mudado
+        refresh_goals([serializer.save()])
 
 class AddSavingProgressView(APIView):
     permission_classes = [IsAuthenticated]
@@ -206,86 +291,142 @@ def get_date_range(period_str):
         end_date = (start_date + relativedelta(months=1)) - timedelta(days=1)
     return start_date, end_date
 
-class DashboardData(APIView):
+class DashboardData(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request):
         today = timezone.now().date()
         tomorrow = today + timedelta(days=1)
         user = request.user
         
-        initial_balance_sum = Account.objects.filter(user=user).aggregate(total=Sum('balance'))['total'] or 0
-        past_present_income = Transaction.objects.filter(user=user, category__type='income', date__lte=today).aggregate(total=Sum('amount'))['total'] or 0
-        past_present_expense = Transaction.objects.filter(user=user, category__type='expense', date__lte=today).aggregate(total=Sum('amount'))['total'] or 0
+        ledger = Ledger(user)
+        initial_balance_sum = ledger.initial_balance(today)
+        past_present_income = ledger.sum(category__type='income', date__lte=today)
+        past_present_expense = ledger.sum(category__type='expense', date__lte=today)
         actual_balance = initial_balance_sum + past_present_income - past_present_expense
-        future_income = Transaction.objects.filter(user=user, category__type='income', date__gt=today).aggregate(total=Sum('amount'))['total'] or 0
-        future_expense = Transaction.objects.filter(user=user, category__type='expense', date__gt=today).aggregate(total=Sum('amount'))['total'] or 0
+        future_income = ledger.sum(category__type='income', date__gt=today)
+        future_expense = ledger.sum(category__type='expense', date__gt=today)
         projected_balance = actual_balance + future_income - future_expense
-        monthly_income = Transaction.objects.filter(user=user, date__year=today.year, date__month=today.month, category__type='income').aggregate(total=Sum('amount'))['total'] or 0
-        monthly_expenses = Transaction.objects.filter(user=user, date__year=today.year, date__month=today.month, category__type='expense').aggregate(total=Sum('amount'))['total'] or 0
-        income_until_today = Transaction.objects.filter(user=user, date__year=today.year, date__month=today.month, category__type='income', date__lte=today).aggregate(total=Sum('amount'))['total'] or 0
-        expenses_until_today = Transaction.objects.filter(user=user, date__year=today.year, date__month=today.month, category__type='expense', date__lte=today).aggregate(total=Sum('amount'))['total'] or 0
+        monthly_income = ledger.sum(date__year=today.year, date__month=today.month, category__type='income')
+        monthly_expenses = ledger.sum(date__year=today.year, date__month=today.month, category__type='expense')
+        income_until_today = ledger.sum(date__year=today.year, date__month=today.month, category__type='income', date__lte=today)
+        expenses_until_today = ledger.sum(date__year=today.year, date__month=today.month, category__type='expense', date__lte=today)
         net_profit = income_until_today - expenses_until_today
         last_month_end = today.replace(day=1) - timedelta(days=1)
         last_month_start = last_month_end.replace(day=1)
-        previous_income = Transaction.objects.filter(user=user, category__type='income', date__range=(last_month_start, last_month_end)).aggregate(total=Sum('amount'))['total'] or 0
-        previous_expenses = Transaction.objects.filter(user=user, category__type='expense', date__range=(last_month_start, last_month_end)).aggregate(total=Sum('amount'))['total'] or 0
+        previous_income = ledger.sum(category__type='income', date__range=(last_month_start, last_month_end))
+        previous_expenses = ledger.sum(category__type='expense', date__range=(last_month_start, last_month_end))
         previous_net_profit = previous_income - previous_expenses
         profit_variation = 0
         if previous_net_profit != 0:
             profit_variation = ((net_profit - previous_net_profit) / abs(previous_net_profit)) * 100
         elif net_profit > 0:
             profit_variation = 100
-        expense_summary = Transaction.objects.filter(user=user, date__year=today.year, date__month=today.month, category__type='expense').values('category__name').annotate(total=Sum('amount')).order_by('-total')
+        expense_summary = ledger.sum_by('category__name', date__year=today.year, date__month=today.month, category__type='expense')
         chart_labels = [item['category__name'] for item in expense_summary if item['category__name']]
         chart_data = [item['total'] for item in expense_summary if item['category__name']]
         upcoming = Transaction.objects.filter(user=user, date__gte=today).order_by('date')
         upcoming_serializer = TransactionSerializer(upcoming, many=True)
 
-        due_today_qs = Transaction.objects.filter(user=user, category__type='expense', date=today, paid=False)
-        due_tomorrow_qs = Transaction.objects.filter(user=user, category__type='expense', date=tomorrow, paid=False)
-        
-        due_today_serializer = TransactionSerializer(due_today_qs, many=True)
-        due_tomorrow_serializer = TransactionSerializer(due_tomorrow_qs, many=True)
+        feed = get_feed(user)
 
         data = {
             "summary": { "actual_balance": actual_balance, "projected_balance": projected_balance, "monthly_income": monthly_income, "monthly_expenses": monthly_expenses, "net_profit": net_profit, "net_profit_variation": round(profit_variation, 2) },
             "expense_chart": {"labels": chart_labels, "data": chart_data},
             "upcoming_transactions": upcoming_serializer.data,
             "notifications": {
-                "due_today": due_today_serializer.data,
-                "due_tomorrow": due_tomorrow_serializer.data
+                "due_today": due_on(feed, today),
+                "due_tomorrow": due_on(feed, tomorrow)
             }
         }
         return Response(data)
 
-class AnalyticsView(APIView):
+class NotificationFeedView(APIView):
+    permission_classes = [IsAuthenticated]
+    def get(self, request):
+        today = timezone.now().date()
+        feed = get_feed(request.user)
+        return Response({
+            "due_today": due_on(feed, today),
+            "due_tomorrow": due_on(feed, today + timedelta(days=1)),
+            "upcoming": feed.items,
+            "budget_alerts": BudgetAlertSerializer(
+                BudgetAlert.objects.filter(user=request.user, goal__end_date__gte=today).select_related('goal').order_by('-created_at')[:20],
+                many=True,
+            ).data,
+            "updated_at": feed.updated_at,
+        })
+
+class SyncView(APIView):
+    permission_classes = [IsAuthenticated]
+    def get(self, request):
+        since = request.query_params.get('since')
+        if since:
+            try:
+                since = parse_datetime(since)
+            except ValueError:
+                # Formato válido, mas data/hora inexistente (ex.: 2024-02-30)
+                since = None
+            if since is None:
+                return Response({"error": "Cursor inválido. Use o 'cursor' devolvido pela sincronização anterior."}, status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+        return Response(changes_since(request, since or None))
+
+class InsightsView(ReplicaReadMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    def get(self, request):
+        try:
+            months = int(request.query_params.get('months', 12))
+            window = int(request.query_params.get('window', 3))
+            if not (2 <= months <= 60 and 2 <= window <= months):
+                raise ValueError
+        except ValueError:
+            return Response({"error": "Use 'months' entre 2 e 60 e 'window' entre 2 e 'months'."}, status=status.HTTP_400_BAD_REQUEST)
+        # Importado aqui: o NumPy é o import mais pesado da API e só este endpoint o usa
+        from .insights import get_insights
+        return Response(get_insights(request.user, timezone.now().date(), months, window))
+
+class CashFlowForecastView(ReplicaReadMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    MAX_DAYS = 3650
+    def get(self, request):
+        try:
+            days = int(request.query_params.get('days', 90))
+            if not 1 <= days <= self.MAX_DAYS:
+                raise ValueError
+        except ValueError:
+            return Response({"error": f"O horizonte deve ser um número de dias entre 1 e {self.MAX_DAYS}."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(build_forecast(request.user, timezone.now().date(), days))
+
+class AnalyticsView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request):
         user = request.user
         period = request.query_params.get('period', 'this_month')
         start_date, end_date = get_date_range(period)
-        current_transactions = Transaction.objects.filter(user=user, date__range=(start_date, end_date))
+        ledger = Ledger(user)
+        period_filter = {'date__range': (start_date, end_date)}
         kpis = {
-            'income': current_transactions.filter(category__type='income').aggregate(total=Sum('amount'))['total'] or 0,
-            'expenses': current_transactions.filter(category__type='expense').aggregate(total=Sum('amount'))['total'] or 0,
-            'income_transactions': current_transactions.filter(category__type='income').count(),
-            'expense_transactions': current_transactions.filter(category__type='expense').count(),
+            'income': ledger.sum(category__type='income', **period_filter),
+            'expenses': ledger.sum(category__type='expense', **period_filter),
+            'income_transactions': ledger.count(category__type='income', **period_filter),
+            'expense_transactions': ledger.count(category__type='expense', **period_filter),
         }
         kpis['net_profit'] = kpis['income'] - kpis['expenses']
         effective_days_end = min(end_date, timezone.now().date())
         num_days = (effective_days_end - start_date).days + 1 if effective_days_end >= start_date else 1
-        expenses_until_today = current_transactions.filter(category__type='expense', date__lte=effective_days_end).aggregate(total=Sum('amount'))['total'] or 0
+        expenses_until_today = ledger.sum(category__type='expense', date__range=(start_date, end_date), date__lte=effective_days_end)
         kpis['average_daily_expense'] = expenses_until_today / num_days if num_days > 0 else 0
-        top_category_query = current_transactions.filter(category__type='expense').values('category__name').annotate(total=Sum('amount')).order_by('-total').first()
+        expense_composition = ledger.sum_by('category__name', category__type='expense', **period_filter)
+        top_category_query = expense_composition[0] if expense_composition else None
         if top_category_query and top_category_query.get('category__name'):
             kpis['top_expense_category'] = { 'name': top_category_query['category__name'], 'amount': top_category_query['total'] }
         else:
             kpis['top_expense_category'] = None
-        income_composition = list(current_transactions.filter(category__type='income').values('category__name').annotate(total=Sum('amount')).order_by('-total'))
-        expense_composition = list(current_transactions.filter(category__type='expense').values('category__name').annotate(total=Sum('amount')).order_by('-total'))
+        income_composition = ledger.sum_by('category__name', category__type='income', **period_filter)
         trunc_kind = TruncMonth if period == 'this_year' else TruncWeek
-        income_timeseries = { str(item['period']): float(item['total']) for item in current_transactions.filter(category__type='income').annotate(period=trunc_kind('date')).values('period').annotate(total=Sum('amount')).order_by('period') }
-        expense_timeseries = { str(item['period']): float(item['total']) for item in current_transactions.filter(category__type='expense').annotate(period=trunc_kind('date')).values('period').annotate(total=Sum('amount')).order_by('period') }
+        income_timeseries = { str(key): float(total) for key, total in ledger.sum_by_period(trunc_kind, category__type='income', **period_filter).items() }
+        expense_timeseries = { str(key): float(total) for key, total in ledger.sum_by_period(trunc_kind, category__type='expense', **period_filter).items() }
         all_dates = sorted(list(set(income_timeseries.keys()) | set(expense_timeseries.keys())))
         labels = [date.fromisoformat(d).strftime('%b') if period == 'this_year' else date.fromisoformat(d).strftime('%d/%m') for d in all_dates]
         timeseries_data = {
@@ -307,16 +448,16 @@ class UserCategoryListView(generics.ListAPIView):
     def get_queryset(self):
         return Category.objects.filter(user=self.request.user).order_by('name')
 
-class CategorySummaryReport(APIView):
+class CategorySummaryReport(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request):
         user = request.user
         period = request.query_params.get('period', 'this_month')
         start_date, end_date = get_date_range(period)
-        summary = Transaction.objects.filter(user=user, category__type='expense', date__range=(start_date, end_date)).values('category__name').annotate(total=Sum('amount')).order_by('-total')
-        return Response(list(summary))
+        summary = Ledger(user).sum_by('category__name', category__type='expense', date__range=(start_date, end_date))
+        return Response(summary)
 
-class CategoryDetailsAnalyticsView(APIView):
+class CategoryDetailsAnalyticsView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request):
         user = request.user
@@ -329,20 +470,20 @@ class CategoryDetailsAnalyticsView(APIView):
             category_obj = Category.objects.get(user=user, name=category_name)
         except Category.DoesNotExist:
             return Response({"error": "Categoria não encontrada."}, status=status.HTTP_404_NOT_FOUND)
-        category_transactions = Transaction.objects.filter(user=user, category=category_obj, date__range=(start_date, end_date))
+        ledger = Ledger(user)
         income = 0
         expenses = 0
         if category_obj.type == 'income':
-            income = category_transactions.aggregate(total=Sum('amount'))['total'] or 0
+            income = ledger.sum(category=category_obj, date__range=(start_date, end_date))
         else:
-            expenses = category_transactions.aggregate(total=Sum('amount'))['total'] or 0
+            expenses = ledger.sum(category=category_obj, date__range=(start_date, end_date))
         percentage = 0
         if category_obj.type == 'expense':
-            total_expenses_in_period = Transaction.objects.filter(user=user, category__type='expense', date__range=(start_date, end_date)).aggregate(total=Sum('amount'))['total'] or 0
+            total_expenses_in_period = ledger.sum(category__type='expense', date__range=(start_date, end_date))
             if total_expenses_in_period > 0:
                 percentage = (expenses / total_expenses_in_period) * 100
         elif category_obj.type == 'income':
-            total_income_in_period = Transaction.objects.filter(user=user, category__type='income', date__range=(start_date, end_date)).aggregate(total=Sum('amount'))['total'] or 0
+            total_income_in_period = ledger.sum(category__type='income', date__range=(start_date, end_date))
             if total_income_in_period > 0:
                 percentage = (income / total_income_in_period) * 100
         data = { "income": income, "expenses": expenses, "percentage": percentage, "type": category_obj.type }